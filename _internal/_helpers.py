@@ -1,3 +1,12 @@
+import contextvars
+import functools
+import sys
+import threading
+import time
+
+import numpy as np
+
+
 def _read_file_column(file_path, column=0, delimiter=',', header_marker="#"):
     """
     Reads the data from the input file. The data is read from the specified column.
@@ -8,14 +17,9 @@ def _read_file_column(file_path, column=0, delimiter=',', header_marker="#"):
     :param header_marker: Marker to identify the header. (Default: '#')
     :return: Returns the data as a list
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-        data = []
-        for line in lines:
-            if line.startswith(header_marker):
-                continue
-            data.append(float(line.strip().split(delimiter)[column]))
-    return data
+    # Parse the whole column in one vectorized pass instead of splitting every line in Python
+    data = np.loadtxt(file_path, delimiter=delimiter, comments=header_marker, usecols=(column,), dtype=np.float64, ndmin=1)
+    return data.tolist()
 
 
 def func_str(func, str):
@@ -28,28 +32,94 @@ def func_str(func, str):
     return f"{func.__name__}({str})"
 
 
-import functools
+# Prefix state of the decorated call running in the current context (thread or task). None outside of one
+_print_prefix = contextvars.ContextVar('_print_prefix', default=None)
+_stdout_lock = threading.Lock()
+_stdout_users = 0
+_installed_stdout = None
+
+
+class _PrefixState:
+    """
+    Prefix of a decorated call and whether its next write starts a new line.
+    """
+    __slots__ = ('prefix', 'line_start')
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.line_start = True
+
+
+class _PrefixDispatchStream:
+    """
+    Stdout wrapper installed while decorated functions run. Prepends the prefix of the calling context to every line
+    and passes writes from any other context through unchanged.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        state = _print_prefix.get()
+        if state is None or not text:
+            return self._stream.write(text)
+        parts = []
+        for line in text.splitlines(keepends=True):
+            if state.line_start:
+                parts.append(state.prefix)
+            parts.append(line)
+            state.line_start = line.endswith(('\n', '\r'))
+        self._stream.write(''.join(parts))
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _acquire_prefix_stream():
+    """
+    Installs the dispatching stream as sys.stdout for the first running decorated call.
+    """
+    global _stdout_users, _installed_stdout
+    with _stdout_lock:
+        if _stdout_users == 0:
+            _installed_stdout = _PrefixDispatchStream(sys.stdout)
+            sys.stdout = _installed_stdout
+        _stdout_users += 1
+
+
+def _release_prefix_stream():
+    """
+    Restores the original sys.stdout once the last running decorated call returns.
+    """
+    global _stdout_users, _installed_stdout
+    with _stdout_lock:
+        _stdout_users -= 1
+        if _stdout_users == 0:
+            if sys.stdout is _installed_stdout:
+                sys.stdout = _installed_stdout._stream
+            _installed_stdout = None
 
 
 def func_name_print_prefix_decorator(func):
+    """
+    Prefixes everything the decorated function prints to stdout with the function name.
+    """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Define a custom print function that prefixes output with the function name
-        def custom_print(*print_args, **print_kwargs):
-            # Prepend the function name to the print arguments
-            prefixed_args = (f"{func.__name__}: {print_args[0]}",) + print_args[1:]
-            print(*prefixed_args, **print_kwargs)
-
-        # Temporarily override the built-in print function in the wrapper's scope
-        built_in_print = print
-        globals()['print'] = custom_print
+        # sys.stdout is process-global, so a single shared stream is installed while any decorated call runs and
+        # the prefix is looked up per context. Prints of other threads stay unprefixed
+        parent = _print_prefix.get()
+        prefix = f"{func.__name__}: " if parent is None else f"{parent.prefix}{func.__name__}: "
+        token = _print_prefix.set(_PrefixState(prefix))
+        _acquire_prefix_stream()
         try:
-            # Execute the original function
-            result = func(*args, **kwargs)
+            return func(*args, **kwargs)
         finally:
-            # Restore the original print function
-            globals()['print'] = built_in_print
-        return result
+            _release_prefix_stream()
+            _print_prefix.reset(token)
 
     return wrapper
 
@@ -58,5 +128,4 @@ def timestamp():
     Returns the current timestamp.
     :return: Returns the current timestamp
     """
-    from datetime import datetime
-    return datetime.now().strftime("%Y%m%d%H%M%S")
\ No newline at end of file
+    return time.strftime("%Y%m%d%H%M%S", time.localtime())
\ No newline at end of file
@@ -1,28 +1,37 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import sys
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, FrozenSet, Optional
 
 from .errors import ConfigError
 
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+_DEFAULT_LOG_LEVEL = "INFO"
+
+
+@dataclass(frozen=True, **_SLOTS)
 class Config:
     """Minimal config object for pylothouse.
 
     Reads from environment variables with prefix PYLH_. Add fields as needed.
+    Instances are immutable; use ``get_config(overrides=...)`` to change values.
     """
-    log_level: str = "INFO"
+    log_level: str = _DEFAULT_LOG_LEVEL
 
     @classmethod
     def from_env(cls, env: Optional[Dict[str, str]] = None) -> "Config":
         e = env or os.environ
         return cls(
-            log_level=e.get("PYLH_LOG_LEVEL", cls.log_level),
+            log_level=e.get("PYLH_LOG_LEVEL", _DEFAULT_LOG_LEVEL),
         )
 
 
+_FIELDS: FrozenSet[str] = frozenset(f.name for f in fields(Config))
+
 _cached: Optional[Config] = None
 
 
@@ -38,10 +47,8 @@ def get_config(overrides: Optional[Dict[str, Any]] = None) -> Config:
     if _cached is None:
         _cached = Config.from_env()
     if overrides:
-        unknown = set(overrides) - set(_cached.__dict__)
+        unknown = overrides.keys() - _FIELDS
         if unknown:
             raise ConfigError(f"Unknown config keys: {sorted(unknown)}")
-        for k, v in overrides.items():
-            setattr(_cached, k, v)
+        _cached = replace(_cached, **overrides)
     return _cached
-
@@ -6,6 +6,8 @@ from typing import Optional
 
 _DEFAULT_FMT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 
+_CONFIGURED = False
+
 
 def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> None:
     """Configure root logging once.
@@ -14,19 +16,20 @@ def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> Non
         level: Log level name; falls back to env PYLH_LOG_LEVEL or INFO.
         fmt: Log format string; falls back to default.
     """
-    if getattr(setup_logging, "_configured", False):
+    global _CONFIGURED
+    if _CONFIGURED:
         return
     lvl = (level or os.getenv("PYLH_LOG_LEVEL") or "INFO").upper()
-    try:
-        numeric_level = getattr(logging, lvl)
-    except AttributeError:
+    # getLevelName maps a known level name to its number with a dict probe
+    numeric_level = logging.getLevelName(lvl)
+    if not isinstance(numeric_level, int):
         numeric_level = logging.INFO
     logging.basicConfig(level=numeric_level, format=fmt or _DEFAULT_FMT)
-    setup_logging._configured = True  # type: ignore[attr-defined]
+    _CONFIGURED = True
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a namespaced logger; ensures logging is configured."""
-    setup_logging()
+    if not _CONFIGURED:
+        setup_logging()
     return logging.getLogger(name)
-
@@ -1,25 +1,38 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Iterable, Optional
+from functools import lru_cache
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 from .errors import PluginError
 
 _REGISTRY: Dict[str, Any] = {}
+_MISSING = object()
+
+
+class _LazyPlugin:
+    """Placeholder for an entry point that is loaded on first lookup."""
+
+    __slots__ = ("ep",)
+
+    def __init__(self, ep: Any) -> None:
+        self.ep = ep
 
 
 def register_plugin(name: str, obj: Any) -> None:
     """Register a plugin object under a unique name."""
-    if name in _REGISTRY:
+    if _REGISTRY.setdefault(name, obj) is not obj:
         raise PluginError(f"Plugin '{name}' is already registered")
-    _REGISTRY[name] = obj
 
 
 def get_plugin(name: str) -> Any:
     """Retrieve a registered plugin by name."""
-    try:
-        return _REGISTRY[name]
-    except KeyError as e:
-        raise PluginError(f"Plugin '{name}' not found") from e
+    obj = _REGISTRY.get(name, _MISSING)
+    if obj is _MISSING:
+        raise PluginError(f"Plugin '{name}' not found")
+    if isinstance(obj, _LazyPlugin):
+        obj = _resolve_lazy(name, obj)
+    return obj
 
 
 def list_plugins() -> Iterable[str]:
@@ -27,38 +40,62 @@ def list_plugins() -> Iterable[str]:
     return sorted(_REGISTRY.keys())
 
 
-def load_entrypoint_plugins(group: str = "pylothouse.plugins") -> int:
+@lru_cache(maxsize=None)
+def _scan_entry_points(group: str) -> Tuple[Any, ...]:
+    """Return the entry points of a group; the metadata scan runs once per group."""
+    try:
+        # Python 3.10+: selecting by keyword skips building the full group mapping
+        return tuple(entry_points(group=group))
+    except TypeError:  # pragma: no cover
+        # Python 3.8/3.9 return a plain {group: [entry points]} mapping
+        return tuple(entry_points().get(group, ()))  # type: ignore[attr-defined]
+
+
+def _materialize(ep: Any) -> Dict[str, Any]:
+    """Load an entry point and return the plugins it provides as name->object."""
+    obj = ep.load()
+    if callable(obj):
+        produced = obj()
+        if isinstance(produced, dict):
+            return dict(produced)
+        return {ep.name: produced}
+    return {ep.name: obj}
+
+
+def _resolve_lazy(name: str, placeholder: _LazyPlugin) -> Any:
+    """Load a lazily registered entry point and replace its placeholder."""
+    try:
+        items = _materialize(placeholder.ep)
+    except Exception as exc:
+        raise PluginError(f"Failed to load plugin '{name}': {exc}") from exc
+    if name not in items:
+        raise PluginError(f"Entry point '{name}' did not provide a plugin named '{name}'")
+    _REGISTRY[name] = items.pop(name)
+    for key, item in items.items():
+        register_plugin(key, item)
+    return _REGISTRY[name]
+
+
+def load_entrypoint_plugins(group: str = "pylothouse.plugins", lazy: bool = False) -> int:
     """Load plugins from entry points if available.
 
     Returns the number of loaded plugins. Entry points must expose a callable
     that returns a mapping of name->object or directly a plugin object, in which
     case the entry point name is used.
-    """
-    try:
-        from importlib.metadata import entry_points  # Python 3.10+
-    except Exception:  # pragma: no cover
-        return 0
 
+    With ``lazy=True`` entry points are registered under their entry point name
+    and only imported on the first ``get_plugin`` call for that name, so optional
+    dependencies are not imported at startup.
+    """
     count = 0
-    try:
-        eps = entry_points().select(group=group)  # type: ignore[attr-defined]
-    except Exception:
-        return 0
-
-    for ep in eps:
+    for ep in _scan_entry_points(group):
         try:
-            obj = ep.load()
-            if callable(obj):
-                produced = obj()
-                if isinstance(produced, dict):
-                    for name, item in produced.items():
-                        register_plugin(name, item)
-                        count += 1
-                else:
-                    register_plugin(ep.name, produced)
-                    count += 1
-            else:
-                register_plugin(ep.name, obj)
+            if lazy:
+                register_plugin(ep.name, _LazyPlugin(ep))
+                count += 1
+                continue
+            for name, item in _materialize(ep).items():
+                register_plugin(name, item)
                 count += 1
         except Exception as exc:  # pragma: no cover
             # Swallow plugin load errors to avoid breaking core
@@ -66,17 +103,3 @@ def load_entrypoint_plugins(group: str = "pylothouse.plugins") -> int:
 
             get_logger(__name__).warning("Failed to load plugin '%s': %s", ep.name, exc)
     return count
-# pylothouse-core
-
-Core utilities for the pylothouse suite: configuration, errors, logging, and a simple plugin registry.
-
-Install
-```bash
-pip install pylothouse-core
-```
-
-From monorepo (local dev)
-```bash
-pip install -e ./packages/pylothouse-core
-```
-
@@ -2,17 +2,40 @@
 import cv2
 import os
 import csv
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 from nnmavutils import fileio
 from nnmavcv import cvutils
 
-def load_ts_keypoints_from_csv(csv_path:str, sort=True, delimiter=',', from_timestamp=0, to_timestamp=0, verbose=False):
+_CSV_READ_BUFFER_SIZE = 1 << 20
+
+
+def _ensure_npy_sidecar(csv_path, delimiter=','):
+    """
+    Make sure a parsed <csv path>.kp.npy copy of the keypoints CSV exists next to it and is newer than the CSV.
+    The array is stored column-major, so each column (the timestamps in particular) is contiguous in the file.
+
+    :param csv_path: Path to the CSV file.
+    :param delimiter: Delimiter used in the CSV file - Default: ','.
+    :return: Path to the .npy sidecar file.
+    """
+    # A distinctive suffix, so an unrelated <stem>.npy next to the CSV is neither loaded nor overwritten
+    sidecar_path = csv_path + '.kp.npy'
+    if not os.path.exists(sidecar_path) or os.path.getmtime(sidecar_path) < os.path.getmtime(csv_path):
+        data = np.loadtxt(csv_path, delimiter=delimiter, comments='#', dtype=np.float64, ndmin=2)
+        np.save(sidecar_path, np.asfortranarray(data))
+    return sidecar_path
+
+
+def load_ts_keypoints_from_csv(csv_path:str, sort=True, delimiter=',', from_timestamp=0, to_timestamp=0, verbose=False, use_npy_cache=False):
     """
     Load the timestamps and keypoints from the CSV file in the format: timestamp, x, y, size, angle, response, octave, class_id
     Access the keypoints using the timestamp as the key.
 
     :param csv_path: Path to the CSV file.
     :type csv_path: str
-    :param sort: If True, sort the timestamps - Default: True.
+    :param sort: If True, sort the timestamps - Default: True. Unsorted files are always loaded in timestamp order.
     :type sort: bool
     :param delimiter: Delimiter used in the CSV file - Default: ','.
     :type delimiter: str
@@ -22,6 +45,8 @@ def load_ts_keypoints_from_csv(csv_path:str, sort=True, delimiter=',', from_time
     :type to_timestamp: int
     :param verbose: If True, print the keypoints - Default: False.
     :type verbose: bool
+    :param use_npy_cache: If True, parse the CSV once into a <csv path>.kp.npy sidecar (regenerated when the CSV is newer) and memory-map it on later loads - Default: False.
+    :type use_npy_cache: bool
 
     :return: Dictionary of timestamps and keypoints: {timestamp: [cv2.KeyPoint, cv2.KeyPoint, ...], ...}
     :rtype: dict
@@ -34,52 +59,72 @@ def load_ts_keypoints_from_csv(csv_path:str, sort=True, delimiter=',', from_time
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"File not found: {csv_path}")
     try:
-        # from_ts_index = fileio.binary_position(file_path=csv_path, target=from_timestamp)
-        old_timestamp = None
+        if use_npy_cache:
+            # Memory-map the parsed sidecar. It is column-major, so the timestamp column is one contiguous read and
+            # the other columns are only read for the rows of the requested window
+            all_data = np.load(_ensure_npy_sidecar(csv_path, delimiter=delimiter), mmap_mode='r')
+            timestamps = all_data[:, 0].astype(np.int64)
+        else:
+            # Parse only the timestamp column to locate the requested window
+            timestamps = np.loadtxt(csv_path, delimiter=delimiter, comments='#', usecols=(0,), dtype=np.float64, ndmin=1).astype(np.int64)
+        length = len(timestamps)
+
+        # The window search and the grouping below need equal timestamps next to each other, so rows of an unsorted
+        # file are put in timestamp order first (stable, so keypoints of a timestamp keep their file order)
+        order = None
+        if np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+
+        # Locate the [from_timestamp, to_timestamp] window with a binary search on the sorted timestamps
+        from_ts_index = int(np.searchsorted(timestamps, from_timestamp, side='left'))
+        if to_timestamp == float('inf'):
+            to_ts_index = length
+        else:
+            to_ts_index = int(np.searchsorted(timestamps, to_timestamp, side='right'))
+        timestamps = timestamps[from_ts_index:to_ts_index]
+
+        # Parse the remaining columns only for the rows inside the window
+        data = np.empty((0, 8), dtype=np.float64)
+        if use_npy_cache:
+            if order is None:
+                data = np.asarray(all_data[from_ts_index:to_ts_index])
+            else:
+                data = np.asarray(all_data[order[from_ts_index:to_ts_index]])
+        elif order is not None:
+            # The window rows are scattered through an unsorted file, so all rows are parsed
+            data = np.loadtxt(csv_path, delimiter=delimiter, comments='#', dtype=np.float64, ndmin=2)[order[from_ts_index:to_ts_index]]
+        elif to_ts_index > from_ts_index:
+            # Stream the file through a large buffer; islice stops reading once the window is consumed
+            with open(csv_path, 'r', buffering=_CSV_READ_BUFFER_SIZE) as f:
+                rows = (line for line in f if line.strip() and not line.startswith('#'))
+                data = np.loadtxt(itertools.islice(rows, from_ts_index, to_ts_index), delimiter=delimiter, dtype=np.float64, ndmin=2)
+
+        # Rows of the same timestamp are now contiguous, so each timestamp maps to a slice of the data
+        unique_timestamps, starts = np.unique(timestamps, return_index=True)
+        ends = np.append(starts[1:], len(timestamps))
+
+        # Cast the integer fields once for all rows instead of per keypoint
+        features = data[:, 1:6].tolist()
+        octaves = data[:, 6].astype(np.int32).tolist()
+        class_ids = data[:, 7].astype(np.int32).tolist()
+        KeyPoint = cv2.KeyPoint
         prog_idx = 0
-        with open(csv_path, 'r') as f:
-            lines = f.readlines()
-            length = len(lines)
-            # Position from_timestamp using binary search in lines
-            from_ts_index = 0
-            high = length
-            while from_ts_index <= high:
-                mid = (from_ts_index + high) // 2
-                mid_timestamp = float(lines[mid].strip().split(delimiter)[0])
-                if mid_timestamp < from_timestamp:
-                    from_ts_index = mid + 1
-                elif mid_timestamp > from_timestamp:
-                    high = mid - 1
-                else:
-                    from_ts_index = mid
-                    break
-
-            # Find the index of the first timestamp greater than or equal to from_timestamp
-            if from_ts_index > 0:
-                while float(lines[from_ts_index-1].strip().split(delimiter)[0]) >= from_timestamp:
-                    from_ts_index -= 1
-            # Iterate through the lines and load the keypoints
-            for i in range(from_ts_index, len(lines)):
-                line = lines[i]
-                if line.startswith('#'):
-                    continue
-                timestamp, x, y, size, angle, response, octave, class_id = map(float, line.strip().split(delimiter))
-                timestamp = int(timestamp)
-                # if timestamp < from_timestamp:
-                #     continue
-                if timestamp > to_timestamp:
-                    break
-                if timestamp not in _keypoints:
-                    _keypoints[timestamp] = []
-                if timestamp != old_timestamp:
-                    old_timestamp = timestamp
-                prog_idx += 1
-                if verbose:
-                    print(f"\n\tKeypoint: x={x}, y={y}, size={size}, angle={angle}, response={response}, octave={octave}, class_id={class_id}, {prog_idx} / {length}")
-                else:
-                    if prog_idx % 100 == 0:
-                        print(f"\rLoading timestamps & keypoints... {prog_idx} / {length}", end="")
-                _keypoints[timestamp].append(cv2.KeyPoint(x, y, size, angle, response, int(octave), int(class_id)))
+        # Report progress roughly every 1% of the rows instead of on every timestamp
+        prog_step = max(1, length // 100)
+        next_report = prog_step
+        for timestamp, start, end in zip(unique_timestamps.tolist(), starts.tolist(), ends.tolist()):
+            if verbose:
+                for i in range(start, end):
+                    x, y, size, angle, response = features[i]
+                    print(f"\n\tKeypoint: x={x}, y={y}, size={size}, angle={angle}, response={response}, octave={octaves[i]}, class_id={class_ids[i]}, {prog_idx + i - start + 1} / {length}")
+            _keypoints[timestamp] = [KeyPoint(x, y, size, angle, response, octave, class_id)
+                                     for (x, y, size, angle, response), octave, class_id
+                                     in zip(features[start:end], octaves[start:end], class_ids[start:end])]
+            prog_idx += end - start
+            if not verbose and prog_idx >= next_report:
+                next_report = prog_idx + prog_step
+                print(f"\rLoading timestamps & keypoints... {prog_idx} / {length}", end="")
         print(f"\nLoaded {len(_keypoints)} timestamps & keypoints\n")
         return _keypoints
     except Exception as e:
@@ -105,26 +150,29 @@ def visualize_ORB_keypoints_from_file(images_dir, output_dir, keypoints_csv_path
     if to_timestamp == 0:
         to_timestamp = float('inf')
     _keypoints = load_ts_keypoints_from_csv(keypoints_csv_path, from_timestamp=from_timestamp, to_timestamp=to_timestamp, verbose=verbose)
-    _keypoints = {k: v for k, v in _keypoints.items() if from_timestamp <= k <= to_timestamp}
     image_paths = cvutils.sorted_image_paths_from_directory(images_dir)
 
-    frame_count = 0
     max_frames = min(max_frames, len(image_paths))
     print("Adding ORB keypoints to images...")
 
-    for image_path in image_paths:
-        frame_count += 1
-        if frame_count >= max_frames:
-            break
-        print(f"\rProgress: {100 * frame_count / max_frames:.2f}%", end="")
-
+    def _draw_keypoints(image_path):
+        timestamp = os.path.splitext(os.path.basename(image_path))[0]
+        keypoints = _keypoints.get(int(timestamp))
+        if keypoints is None:
+            return
         image = cvutils.load_image(image_path, grayscale=grayscale_images)
-        timestamp = image_path.split('/')[-1].split('.')[0]
-        if int(timestamp) not in _keypoints:
-            continue
-        image_with_keypoints = cv2.drawKeypoints(image, _keypoints[int(timestamp)], None, color=(0, 255, 0), flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+        image_with_keypoints = cv2.drawKeypoints(image, keypoints, None, color=(0, 255, 0), flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
         output_path = os.path.join(output_dir, f'{timestamp}.png')
         cv2.imwrite(output_path, image_with_keypoints)
 
+    # Frames are independent and OpenCV releases the GIL while decoding, drawing and encoding, so threads scale
+    frame_count = 0
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(_draw_keypoints, image_path) for image_path in image_paths[:max_frames]]
+        for future in as_completed(futures):
+            future.result()
+            frame_count += 1
+            print(f"\rProgress: {100 * frame_count / max_frames:.2f}%", end="")
+
     print(f"\rProgress: {100 * frame_count / max_frames:.2f}%")
-    print(f"\nORB keypoints added to {frame_count} images")
\ No newline at end of file
+    print(f"\nORB keypoints added to {frame_count} images")
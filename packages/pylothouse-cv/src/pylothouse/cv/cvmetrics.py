@@ -2,12 +2,58 @@ import cv2
 import numpy as np
 
 
+def _has_exact_sums(pixels):
+    """
+    Check whether the sum and sum of squares of the image fit exactly in 64-bit integers (integer images of up to 16 bits).
+    For other images E[x^2] - E[x]^2 cancels catastrophically when the mean is large compared to the spread
+    """
+    return pixels.dtype.kind in 'ui' and pixels.dtype.itemsize <= 2
+
+
+def _pixel_sums(pixels):
+    """
+    Calculate the sum and the sum of squares of a flattened 8/16-bit integer image without allocating a float64 copy of it
+    :param pixels: flattened image
+    :return: (sum, sum of squares) as exact integers
+    """
+    accumulator = np.uint64 if pixels.dtype.kind == 'u' else np.int64
+    return int(pixels.sum(dtype=accumulator)), int(np.einsum('i,i->', pixels, pixels, dtype=accumulator))
+
+
+def _stdev_from_sums(n, total, total_sq):
+    """
+    Calculate the standard deviation from the pixel count, the exact sum and the exact sum of squares
+    """
+    L_avg = total / n
+    return max(total_sq / n - L_avg * L_avg, 0.0) ** 0.5
+
+
+def _is_gray_uint8(image):
+    """
+    Check whether the image can be handed to the SIMD-optimized OpenCV reductions (single channel, 8-bit)
+    """
+    return isinstance(image, np.ndarray) and image.ndim == 2 and image.dtype == np.uint8
+
+
+def _min_max(image):
+    """
+    Calculate the minimum and maximum pixel values of the image
+    :return: (minimum, maximum) as floats
+    """
+    if _is_gray_uint8(image):
+        L_min, L_max, _, _ = cv2.minMaxLoc(image)
+        return L_min, L_max
+    return float(np.min(image)), float(np.max(image))
+
+
 def average_px_intensity(image, precision=5):
     """
     Calculate the average pixel intensity of the image
     :param image: image to calculate the average pixel intensity. Should be a grayscale image
     :return: average pixel intensity of the image
     """
+    if _is_gray_uint8(image):
+        return np.float64(cv2.mean(image)[0]).round(precision)
     average_px_intensity = np.mean(image).round(precision)
     return average_px_intensity
 
@@ -17,6 +63,8 @@ def luminosity(image, precision=5):
     :param image: image to calculate the luminosity. Should be a grayscale image
     :return: luminosity of the image
     """
+    if isinstance(image, np.ndarray) and image.dtype.kind == 'u':
+        return image.sum(dtype=np.uint64)
     luminosity = np.sum(image).round(precision)
     return luminosity
 
@@ -27,7 +75,13 @@ def stdev_px_intensity(image, precision=5):
     :param image: image to calculate the standard deviation of the luminance. Should be a grayscale image
     :return: standard deviation of the luminance of the image
     """
-    stdev_px_intensity = np.std(image).round(precision)
+    if _is_gray_uint8(image):
+        _, stddev = cv2.meanStdDev(image)
+        return np.float64(stddev[0, 0]).round(precision)
+    pixels = np.ravel(image)
+    if not _has_exact_sums(pixels):
+        return np.std(image).round(precision)
+    stdev_px_intensity = np.float64(_stdev_from_sums(pixels.size, *_pixel_sums(pixels))).round(precision)
     return stdev_px_intensity
 
 def contrast_michelson(image, precision=5):
@@ -36,15 +90,11 @@ def contrast_michelson(image, precision=5):
     :param image: image to calculate the contrast ratio. Should be a grayscale image
     :return: contrast ratio of the image
     """
-    L_max = np.max(image).round(precision)
-    L_min = np.min(image).round(precision)
-    # Clip values to prevent overflow
-    L_max = np.clip(L_max, -1e10, 1e10)
-    L_min = np.clip(L_min, -1e10, 1e10)
+    L_min, L_max = _min_max(image)
     if L_max + L_min == 0:
         return float('inf')
-    
-    contrast_ratio = ((L_max - L_min) / (L_max + L_min)).round(precision)
+
+    contrast_ratio = round((L_max - L_min) / (L_max + L_min), precision)
     return contrast_ratio
 
 def contrast_ratio(image, precision=5):
@@ -53,14 +103,10 @@ def contrast_ratio(image, precision=5):
     :param image: image to calculate the contrast ratio. Should be a grayscale image
     :return: contrast ratio of the image
     """
-    L_max = np.max(image).round(precision)
-    L_min = np.min(image).round(precision)
-    # Clip values to prevent overflow
-    L_max = np.clip(L_max, -1e10, 1e10)
-    L_min = np.clip(L_min, -1e10, 1e10)
+    L_min, L_max = _min_max(image)
     if L_min == 0:
         return float('inf')
-    
+
     contrast_ratio = L_max / L_min
     return contrast_ratio
 
@@ -71,13 +117,75 @@ def lighting_uniformity_avg(image):
     :param image: image to calculate the lighting uniformity. Should be a grayscale image
     :return: lighting uniformity of the image
     """
-    L_avg = np.mean(image)
-    L_min = np.min(image)
-    L_avg = np.clip(L_avg, -1e10, 1e10)
-    L_min = np.clip(L_min, -1e10, 1e10)
+    if _is_gray_uint8(image):
+        L_avg = cv2.mean(image)[0]
+    else:
+        L_avg = float(np.mean(image))
+    L_min, _ = _min_max(image)
     if L_avg == 0:
         return float('inf')  # or handle appropriately
 
     lighting_uniformity = L_min / L_avg
     return lighting_uniformity
 
+
+def _stats_from_sums(n, total, stdev, L_min, L_max, precision):
+    """
+    Derive all the image metrics of this module from the pixel count, sum, standard deviation, minimum and maximum
+    """
+    L_avg = total / n
+
+    return {
+        'average_px_intensity': round(L_avg, precision),
+        'luminosity': round(total, precision),
+        'stdev_px_intensity': round(stdev, precision),
+        'contrast_michelson': float('inf') if L_max + L_min == 0 else round((L_max - L_min) / (L_max + L_min), precision),
+        'contrast_ratio': float('inf') if L_min == 0 else L_max / L_min,
+        'lighting_uniformity_avg': float('inf') if L_avg == 0 else L_min / L_avg,
+        'min': L_min,
+        'max': L_max,
+    }
+
+
+def image_stats(image, precision=5):
+    """
+    Calculate all the image metrics of this module from shared reductions over the image, instead of one set per metric.
+    8-bit grayscale images take two SIMD-optimized OpenCV passes (minMaxLoc and meanStdDev). Other images take a
+    min/max pass, a sum pass and a sum-of-squares pass (8/16-bit integers) or a two-pass np.std (floats)
+    :param image: image to calculate the metrics. Should be a grayscale image
+    :return: dictionary with the keys: average_px_intensity, luminosity, stdev_px_intensity, contrast_michelson, contrast_ratio, lighting_uniformity_avg, min, max
+    """
+    if _is_gray_uint8(image):
+        L_min, L_max, _, _ = cv2.minMaxLoc(image)
+        mean, stddev = cv2.meanStdDev(image)
+        # The exact integer sum is recovered from the mean; its rounding error is far below 0.5 for any image size
+        total = int(round(mean[0, 0] * image.size))
+        return _stats_from_sums(image.size, total, float(stddev[0, 0]), L_min, L_max, precision)
+    pixels = np.ravel(image)
+    L_min, L_max = _min_max(image)
+    if _has_exact_sums(pixels):
+        total, total_sq = _pixel_sums(pixels)
+        stdev = _stdev_from_sums(pixels.size, total, total_sq)
+    else:
+        total = float(pixels.sum(dtype=np.float64))
+        stdev = float(np.std(pixels))
+    return _stats_from_sums(pixels.size, total, stdev, L_min, L_max, precision)
+
+
+def image_stats_from_hist(image, precision=5):
+    """
+    Calculate all the image metrics of this module from a 256-bin histogram of the image.
+    After the single histogram pass every metric is derived from the 256 counts, independently of the image size.
+    Images that are not single-channel uint8 fall back to image_stats
+    :param image: image to calculate the metrics. Should be a grayscale uint8 image
+    :return: dictionary with the same keys as image_stats
+    """
+    if not _is_gray_uint8(image):
+        return image_stats(image, precision=precision)
+    hist = cv2.calcHist([image], [0], None, [256], [0, 256]).ravel().astype(np.float64)
+    levels = np.flatnonzero(hist)
+    L_min, L_max = float(levels[0]), float(levels[-1])
+    intensities = np.arange(256, dtype=np.float64)
+    total = float(np.dot(intensities, hist))
+    total_sq = float(np.dot(intensities * intensities, hist))
+    return _stats_from_sums(image.size, total, _stdev_from_sums(image.size, total, total_sq), L_min, L_max, precision)
@@ -1,11 +1,55 @@
 import cv2
 import os
 import json
-from nnmavutils import fileio
+import mmap
+import shutil
+import subprocess
+import itertools
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from _internal import _helpers
 
+# Number of frames decoded ahead of the video writer
+_VIDEO_PREFETCH_FRAMES = 16
+
+# cv2.imread flags that let the decoder scale the image down by the given factor
+_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
 # Load/Save utilities
+def _read_decode(image_path, flags=cv2.IMREAD_COLOR):
+    """
+    Memory-map an image file and decode it with cv2.imdecode, so file I/O is done by Python and only the decode runs in OpenCV.
+    The encoded bytes are decoded straight from the mapped pages, without copying them into a Python buffer first.
+    Where supported, the kernel is hinted that the file is read sequentially, so readahead fills the page cache.
+
+    :param image_path: Path to the image file.
+    :type image_path: str
+    :param flags: cv2.IMREAD_* flag passed to cv2.imdecode. (Default: cv2.IMREAD_COLOR)
+    :type flags: int
+    :return: Decoded image, or None if the file is empty or cannot be decoded.
+    :rtype: numpy.ndarray
+    """
+    with open(image_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            buffer = np.frombuffer(mapped, np.uint8)
+            image = cv2.imdecode(buffer, flags)
+            # Release the exported buffer before the map is closed
+            del buffer
+    return image
+
+
 def load_image(image_path, grayscale=False, to_rgb=False):
     """
 
@@ -35,13 +79,13 @@ def load_image_with_timestamp(images_dir, timestamp, format='png', grayscale=Fal
         raise FileNotFoundError(f"Directory {images_dir} does not exist.")
     if not format in ['png', 'jpg', 'jpeg']:
         raise ValueError("Invalid image format. Supported formats: ['png', 'jpg', 'jpeg']")
-    image_path = os.path.join(images_dir, f"{timestamp}.png")
+    image_path = os.path.join(images_dir, f"{timestamp}.{format}")
 
     return load_image(image_path, grayscale=grayscale, to_rgb=to_rgb)
 
 
 
-def sorted_timestamps_from_csv(csv_path:str, column_index=0, from_timestamp=0, to_timestamp=0, delimiter=','):
+def sorted_timestamps_from_csv(csv_path:str, column_index=0, from_timestamp=0, to_timestamp=0, delimiter=',', out_type='list'):
     """
 
     :param csv_path: Path to the CSV file.
@@ -54,24 +98,55 @@ def sorted_timestamps_from_csv(csv_path:str, column_index=0, from_timestamp=0, t
     :type to_timestamp: int
     :param delimiter: CSV delimiter - Default: ','.
     :type delimiter: str
+    :param out_type: Output type. Options: ['list', 'ndarray'] - Default: 'list'.
+    :type out_type: str
     :return: Sorted timestamps from the CSV file.
-    :rtype: list
+    :rtype: list or numpy.ndarray
+    """
+    if out_type not in ['list', 'ndarray']:
+        raise ValueError(_helpers.func_str(sorted_timestamps_from_csv, f"Invalid out_type: {out_type}. Options: ['list', 'ndarray']"))
+    # Parse the column as int64 (exact for nanosecond timestamps), then filter and sort in numpy
+    timestamps = np.loadtxt(csv_path, delimiter=delimiter, usecols=column_index, dtype=np.int64, ndmin=1)
+    mask = timestamps >= from_timestamp
+    if to_timestamp:
+        mask &= timestamps <= to_timestamp
+    timestamps = np.sort(timestamps[mask])
+    return timestamps.tolist() if out_type == 'list' else timestamps
+
+
+def iter_image_paths(directory, extensions=('.png', '.jpg', '.jpeg')):
+    """
+    Lazily yield the image paths of a directory, in directory order. Useful when only the first match (or whether there is any) is needed.
+
+    :param directory: Directory containing images.
+    :param extensions: Extensions of the images to be considered. Matched case-insensitively. (Default: ('.png', '.jpg', '.jpeg'))
+    :return: Iterator of image paths.
     """
-    timestamps = fileio.load_column_from_file(csv_path, column=column_index, from_number=from_timestamp, to_number=to_timestamp, delimiter=delimiter, out_type=int)
-    timestamps.sort()
-    return timestamps
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Directory {directory} does not exist.")
+    if isinstance(extensions, str):
+        extensions = (extensions,)
+    # splitext keeps the dot, so extensions given without one ('png') are matched as '.png'
+    suffixes = frozenset(extension.lower() if extension.startswith('.') else f".{extension.lower()}" for extension in extensions)
+    # DirEntry carries the joined path and cached file type, avoiding os.path.join and extra stat calls
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() in suffixes and entry.is_file():
+                yield entry.path
 
 
 def image_paths_from_directory(directory, extensions=('.png', '.jpg', '.jpeg')):
     """
     :param directory: Directory containing images.
-    :param extensions: Extensions of the images to be considered. (Default: ('.png', '.jpg', '.jpeg'))
+    :param extensions: Extensions of the images to be considered. Matched case-insensitively. (Default: ('.png', '.jpg', '.jpeg'))
     :return: List of image paths.
     """
-    image_paths = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(extensions)]
-    if not image_paths:
-        raise FileNotFoundError("No images found in the directory.")
-    return image_paths
+    image_paths = iter_image_paths(directory, extensions)
+    try:
+        first_path = next(image_paths)
+    except StopIteration:
+        raise FileNotFoundError("No images found in the directory.") from None
+    return [first_path, *image_paths]
 
 def sorted_image_paths_from_directory(directory, extensions=('.png', '.jpg', '.jpeg')):
     """
@@ -80,8 +155,10 @@ def sorted_image_paths_from_directory(directory, extensions=('.png', '.jpg', '.j
     :return: Sorted list of image paths.
     """
     image_paths = image_paths_from_directory(directory, extensions)
-    image_paths.sort(key=lambda x: int(os.path.splitext(os.path.basename(x))[0]))
-    return image_paths
+    # Parse each timestamp once into an int64 array and sort it in C
+    timestamps = np.fromiter((int(os.path.splitext(os.path.basename(path))[0]) for path in image_paths), dtype=np.int64, count=len(image_paths))
+    order = np.argsort(timestamps, kind='stable')
+    return [image_paths[i] for i in order.tolist()]
 
 # Basic image processing utilities
 
@@ -99,7 +176,7 @@ def draw_point_on_image(image, point, color=(0, 0, 255), radius=2):
     :rtype: numpy.ndarray
 
     """
-    if isinstance(point, list) or isinstance(point, np.ndarray) or isinstance(point, tuple):
+    if isinstance(point, (list, tuple, np.ndarray)):
         center = [int(point[0]), int(point[1])]
     else:
         raise ValueError(_helpers.func_str(draw_point_on_image, "Invalid point. Expected a list, tuple, or numpy array of two integers (x, y)"))
@@ -135,8 +212,78 @@ def draw_quad_on_image(image, quad, color=(0, 255, 0), thickness=2, fill=False,
     return image
 
 def draw_pgram_on_image(image, x, y, w, h, color=(0, 255, 0), thickness=2, fill=False, fill_color=(0, 255, 0)):
-    pgram = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
-    return draw_quad_on_image(image, pgram, color=color, thickness=thickness, fill=fill, fill_color=fill_color)
+    x, y, w, h = int(x), int(y), int(w), int(h)
+    # Axis-aligned, so the dedicated rectangle rasterizer is used instead of the general polygon one
+    if fill:
+        cv2.rectangle(image, (x, y), (x + w, y + h), color=fill_color, thickness=-1)
+    else:
+        cv2.rectangle(image, (x, y), (x + w, y + h), color=color, thickness=thickness)
+    return image
+
+
+# Text anchor per position: (image, text_width, text_height, row, padding) -> (x, y)
+_TEXT_POSITIONS = {
+    'topleft': lambda image, w, h, row, pad: (pad, (h + pad) * row),
+    'topright': lambda image, w, h, row, pad: (image.shape[1] - w - pad, (h + pad) * row),
+    'bottomleft': lambda image, w, h, row, pad: (pad, image.shape[0] - (h + pad) * row),
+    'bottomright': lambda image, w, h, row, pad: (image.shape[1] - w - pad, image.shape[0] - (h + pad) * row),
+}
+
+# Video codec per output file extension
+_VIDEO_CODECS = {'.mp4': 'mp4v', '.mov': 'avc1', '.avi': 'XVID', '.mkv': 'X264'}
+
+
+class _FFmpegVideoWriter:
+    """
+    Minimal cv2.VideoWriter stand-in that pipes raw BGR frames to an ffmpeg process encoding with multi-threaded libx264.
+    """
+
+    def __init__(self, output_video_file, fps, size, crf=23, preset='ultrafast'):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise FileNotFoundError("ffmpeg executable not found on PATH")
+        width, height = size
+        command = [ffmpeg, '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+                   # yuv420p for player compatibility; it needs even dimensions
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p',
+                   '-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-threads', '0', output_video_file]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self._frame_shape = (height, width, 3)
+
+    def write(self, frame):
+        # Raw video has no frame boundaries, so a missing or differently sized frame would shift every later frame.
+        # Such frames are skipped, as cv2.VideoWriter does
+        if not isinstance(frame, np.ndarray) or frame.shape != self._frame_shape or frame.dtype != np.uint8:
+            height, width, _ = self._frame_shape
+            print(f"Warning: skipping a frame that is not a {width}x{height} BGR uint8 image")
+            return
+        self._process.stdin.write(np.ascontiguousarray(frame).data)
+
+    def release(self):
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self._process.returncode}")
+
+    def kill(self):
+        """
+        Stop the ffmpeg process without finishing the video, e.g. when writing the frames failed.
+        """
+        self._process.kill()
+        self._process.wait()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            # The buffered bytes cannot be flushed into the closed pipe
+            pass
+
+
+@lru_cache(maxsize=4096)
+def _text_size(text, font, font_scale, line_type):
+    """
+    Cached cv2.getTextSize, as batch annotation measures the same strings with the same font repeatedly.
+    """
+    return cv2.getTextSize(text, font, font_scale, line_type)
 
 
 def write_text_on_image(image, text, row=1, position='topleft', font=cv2.FONT_HERSHEY_SIMPLEX, font_scale=1, font_color=(255, 255, 255), line_type=2, background_color:tuple=None):
@@ -164,32 +311,26 @@ def write_text_on_image(image, text, row=1, position='topleft', font=cv2.FONT_HE
 
     """
     _padding = 15
-    text_size = cv2.getTextSize(text, font, font_scale, line_type)
-    if isinstance(position, tuple) or isinstance(position, list):
-        posX = position[0]
-        posY = position[1]
+    text_size = _text_size(text, font, font_scale, line_type)
+    if isinstance(position, (tuple, list)):
+        posX = int(position[0])
+        posY = int(position[1])
     else:
-        if not position in ['topleft', 'topright', 'bottomleft', 'bottomright']:
-            raise ValueError(_helpers.func_str(write_text_on_image, f"Invalid position parameter: {position}. Options: ['topleft', 'topright', 'bottomleft', 'bottomright'] or tuple/list of coordinates (x, y)"))
-        if position == 'topleft' or position == 'bottomleft': # Left/Right
-            posX = _padding
-        else:
-            posX = image.shape[1] - text_size[0][0] - _padding
-        if position == 'topleft' or position == 'topright': # Top/Bottom
-            posY = text_size[0][1] * row + _padding*row
-        else:
-            posY = image.shape[0] - text_size[0][1] * row - _padding*row
+        anchor = _TEXT_POSITIONS.get(position)
+        if anchor is None:
+            raise ValueError(_helpers.func_str(write_text_on_image, f"Invalid position parameter: {position}. Options: {list(_TEXT_POSITIONS)} or tuple/list of coordinates (x, y)"))
+        posX, posY = anchor(image, text_size[0][0], text_size[0][1], row, _padding)
     if background_color != None:
         if len(background_color) != 3:
             raise ValueError(_helpers.func_str(write_text_on_image, "Invalid background color. Expected a tuple of 3 integers (B, G, R)"))
         else:
-            draw_pgram_on_image(image, posX, posY-text_size[0][1]-_padding/2, text_size[0][0], text_size[0][1]+_padding, color=background_color, fill=True, fill_color=background_color, thickness=-1)
+            draw_pgram_on_image(image, posX, posY-text_size[0][1]-_padding//2, text_size[0][0], text_size[0][1]+_padding, color=background_color, fill=True, fill_color=background_color, thickness=-1)
     coordinates = (posX, posY)
     cv2.putText(image, text, coordinates, font, font_scale, font_color, line_type)
     return image
 
 
-def write_filenames_on_images(images_directory, row=1, font=cv2.FONT_HERSHEY_SIMPLEX, font_scale=1, font_color=(255, 255, 255), line_type=2):
+def write_filenames_on_images(images_directory, row=1, font=cv2.FONT_HERSHEY_SIMPLEX, font_scale=1, font_color=(255, 255, 255), line_type=2, use_opencl=False):
     """
     Write filenames on images in a directory.
 
@@ -205,15 +346,28 @@ def write_filenames_on_images(images_directory, row=1, font=cv2.FONT_HERSHEY_SIM
     :type font_color: tuple
     :param line_type: Type of line. (Default: 2)
     :type line_type: int
+    :param use_opencl: Draw on cv2.UMat images so OpenCV can run the drawing through OpenCL. Ignored if OpenCL is not available. (Default: False)
+    :type use_opencl: bool
     :return: Writes filenames on images in the directory.
     :rtype: None
 
     """
+    use_opencl = use_opencl and cv2.ocl.haveOpenCL()
     image_paths = sorted_image_paths_from_directory(images_directory)
-    for image_path in image_paths:
-        image = cv2.imread(image_path)
+
+    def _write_filename(image_path):
+        image = _read_decode(image_path)
+        if use_opencl:
+            # Text is drawn at the top left, which does not need the image shape (unavailable on a UMat)
+            image = cv2.UMat(image)
         image = write_text_on_image(image, os.path.basename(image_path), row=row, font=font, font_scale=font_scale, font_color=font_color, line_type=line_type)
+        if use_opencl:
+            image = image.get()
         cv2.imwrite(image_path, image)
+
+    # Each file is independent and decode/encode release the GIL, so images are processed on a thread pool
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(_write_filename, image_paths))
     print(f"File names written on images in {images_directory}")
 
 
@@ -242,7 +396,7 @@ def compress_image(image, quality=50, output_path=None):
 
 
 # Video processing utilities
-def create_video_from_timestamped_images(images_directory, output_video_file, fps, quality=100, verbose=True):
+def create_video_from_timestamped_images(images_directory, output_video_file, fps, quality=100, verbose=True, *, mjpeg=False, downscale=1, ffmpeg=False):
     """
     Create a video from a directory containing images named with their timestamps as <timestamp>.extension. Allowed image formats: [.png, .jpg, and .jpeg].
 
@@ -256,6 +410,12 @@ def create_video_from_timestamped_images(images_directory, output_video_file, fp
     :type quality: int
     :param verbose: Print progress messages. (Default: True)
     :type verbose: bool
+    :param mjpeg: Encode the video as Motion JPEG (.avi only) at the given quality instead of the extension's default codec. Frames are JPEG-encoded once by the writer instead of being compressed and decoded before encoding. (Default: False)
+    :type mjpeg: bool
+    :param downscale: Reduce the frame resolution by this factor while decoding (libjpeg DCT scaling). Options: [1, 2, 4, 8]. (Default: 1, full resolution)
+    :type downscale: int
+    :param ffmpeg: Encode with multi-threaded H.264 (libx264) in a separate ffmpeg process instead of cv2.VideoWriter. Requires ffmpeg on PATH. (Default: False)
+    :type ffmpeg: bool
     :return: Writes all images into a video.
     :rtype: None
 
@@ -263,12 +423,17 @@ def create_video_from_timestamped_images(images_directory, output_video_file, fp
     quality = int(quality)
     if quality < 0 or quality > 100:
         raise ValueError(_helpers.func_str(create_video_from_timestamped_images, "Quality should be between 0 and 100"))
+    if downscale not in _REDUCED_COLOR_FLAGS:
+        raise ValueError(_helpers.func_str(create_video_from_timestamped_images, f"Invalid downscale factor: {downscale}. Options: {list(_REDUCED_COLOR_FLAGS)}"))
+    read_flag = _REDUCED_COLOR_FLAGS[downscale]
+    if mjpeg and ffmpeg:
+        raise ValueError(_helpers.func_str(create_video_from_timestamped_images, "mjpeg and ffmpeg cannot be used together"))
 
     # Get sorted list of all images in the directory
     image_paths = sorted_image_paths_from_directory(images_directory)
 
-    # Read the first image to get the size
-    first_image = cv2.imread(image_paths[0])
+    # Decode the first image to get the size; it is written as the first frame rather than decoded again
+    first_image = _read_decode(image_paths[0], read_flag)
     height, width, layers = first_image.shape
     size = (width, height)
     fps = float(fps)
@@ -278,20 +443,25 @@ def create_video_from_timestamped_images(images_directory, output_video_file, fp
     if output_directory and not os.path.exists(output_directory):
         os.makedirs(output_directory)
 
-    # Define the codec and create VideoWriter object based on file extension
-    if output_video_file.endswith('.mp4'):
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for MP4
-    elif output_video_file.endswith('.mov'):
-        fourcc = cv2.VideoWriter_fourcc(*'avc1')  # Codec for MOV
-    elif output_video_file.endswith('.avi'):
-        fourcc = cv2.VideoWriter_fourcc(*'XVID')  # Codec for AVI
-    elif output_video_file.endswith('.mkv'):
-        fourcc = cv2.VideoWriter_fourcc(*'X264')  # Codec for MKV
-    else:
+    # Define the codec based on file extension
+    extension = os.path.splitext(output_video_file)[1]
+    codec = _VIDEO_CODECS.get(extension)
+    if codec is None:
         raise ValueError("Unsupported file format. Please use [.mp4, .mov, .avi, or .mkv] as the extension for the output video file")
+    fourcc = cv2.VideoWriter_fourcc(*codec)
 
     # Define the codec and create VideoWriter object
-    out = cv2.VideoWriter(output_video_file, fourcc, fps, size)
+    if ffmpeg:
+        # The encoder runs in its own process, so the main thread only copies frame bytes into the pipe
+        out = _FFmpegVideoWriter(output_video_file, fps, size)
+    elif mjpeg:
+        if extension != '.avi':
+            raise ValueError(_helpers.func_str(create_video_from_timestamped_images, "Motion JPEG output requires an .avi output video file"))
+        # OpenCV's built-in MJPEG writer quantizes the frames itself, so no separate JPEG round trip is needed
+        out = cv2.VideoWriter(output_video_file, cv2.CAP_OPENCV_MJPEG, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+        out.set(cv2.VIDEOWRITER_PROP_QUALITY, quality)
+    else:
+        out = cv2.VideoWriter(output_video_file, fourcc, fps, size)
 
     if verbose:
         print(f"Creating video from {len(image_paths)} images at {fps} fps. Source: {images_directory}")
@@ -299,14 +469,40 @@ def create_video_from_timestamped_images(images_directory, output_video_file, fp
     # Progress
     _total_images = len(image_paths)
     _image_counter = 0
-    # Process each image and write to the video
-    for image_path in image_paths:
-        img = cv2.imread(image_path)
-        if quality < 100:
+    _progress_step = max(1, _total_images // 100)
+
+    def _compress_frame(img):
+        if img is not None and quality < 100 and not mjpeg:
             img = compress_image(img, quality=quality)
-        out.write(img)
-        _image_counter += 1
-        print(f"[create_video_from_timestamped_images]: Processed {_image_counter} of {_total_images} images", end="\r")
+        return img
+
+    def _load_frame(image_path):
+        return _compress_frame(_read_decode(image_path, read_flag))
+
+    # Decode upcoming frames on worker threads while the main thread writes the current one.
+    # cv2.imread/imencode/imdecode release the GIL, so decoding overlaps with encoding.
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            remaining_paths = itertools.islice(image_paths, 1, None)
+            pending_frames = deque(executor.submit(_load_frame, image_path) for image_path in itertools.islice(remaining_paths, _VIDEO_PREFETCH_FRAMES))
+            out.write(_compress_frame(first_image))
+            _image_counter += 1
+            while pending_frames:
+                img = pending_frames.popleft().result()
+                next_path = next(remaining_paths, None)
+                if next_path is not None:
+                    pending_frames.append(executor.submit(_load_frame, next_path))
+                out.write(img)
+                _image_counter += 1
+                if verbose and (_image_counter % _progress_step == 0 or _image_counter == _total_images):
+                    print(f"[create_video_from_timestamped_images]: Processed {_image_counter} of {_total_images} images", end="\r")
+    except BaseException:
+        # Do not leave the encoder process running when a frame cannot be loaded or written
+        if isinstance(out, _FFmpegVideoWriter):
+            out.kill()
+        else:
+            out.release()
+        raise
 
     # Release the VideoWriter object
     out.release()
@@ -314,6 +510,24 @@ def create_video_from_timestamped_images(images_directory, output_video_file, fp
 
 # ML, DL utilities
 
+def _iter_json_object_items(file_path):
+    """
+    Iterate over the (key, value) pairs of a JSON file whose top level is an object.
+    The file is streamed with ijson when it is installed, otherwise it is loaded at once with json.
+
+    :param file_path: Path to the JSON file.
+    :type file_path: str
+    :return: Iterator of (key, value) pairs.
+    """
+    try:
+        import ijson
+    except ImportError:
+        with open(file_path, 'r') as f:
+            yield from json.load(f).items()
+        return
+    with open(file_path, 'rb') as f:
+        yield from ijson.kvitems(f, '', use_float=True)
+
 def load_timestamped_bounding_boxes_from_file(file_path, from_timestamp=0, to_timestamp=0):
     """
     Load bounding boxes from a file containing timestamps and bounding boxes. The file should be in JSON format with timestamps as keys and bounding boxes as values that include the confidence.
@@ -326,25 +540,48 @@ def load_timestamped_bounding_boxes_from_file(file_path, from_timestamp=0, to_ti
     """
     if to_timestamp <= 0:
         to_timestamp = float('inf')
+    # Filter while parsing so out-of-range detections are dropped immediately
     timestamped_bboxes = {}
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-        sorted_timestamps = sorted([int(timestamp) for timestamp in data.keys()])
-
-    length = len(sorted_timestamps)
-    prog_idx = 0
-    for timestamp in sorted_timestamps:
-        if timestamp < from_timestamp:
-            continue
-        if timestamp > to_timestamp:
-            continue
-        timestamped_bboxes[timestamp] = data[str(timestamp)]
-        prog_idx += 1
-        print(f"Loading Detections: {prog_idx}/{length}", end="\r")
+    for timestamp, bboxes in _iter_json_object_items(file_path):
+        timestamp = int(timestamp)
+        if from_timestamp <= timestamp <= to_timestamp:
+            timestamped_bboxes[timestamp] = bboxes
+    # Sort only the kept timestamps
+    timestamped_bboxes = dict(sorted(timestamped_bboxes.items()))
     print(f"\nLoaded {len(timestamped_bboxes)} detections from {file_path}\n")
     return timestamped_bboxes
 
-def remove_color_from_image(image_path, target_color, output_path):
+
+# Loading the parallel kernel, even from numba's disk cache, takes around 0.5 s per process while it saves only
+# ~3 ns per pixel over cv2.inRange, so it only pays off for very large images
+_ZERO_COLOR_KERNEL_MIN_PIXELS = 100_000_000
+
+
+@lru_cache(maxsize=None)
+def _zero_color_kernel():
+    """
+    Compile (on first use) a numba kernel that compares and zeroes matching pixels in one parallel pass.
+
+    :return: The kernel zero_color(image, b, g, r, tolerance), or None if numba is not installed.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    @numba.njit(parallel=True, cache=True)
+    def _zero_color(image, b, g, r, tolerance):
+        for i in numba.prange(image.shape[0]):
+            for j in range(image.shape[1]):
+                if abs(np.int64(image[i, j, 0]) - b) <= tolerance and abs(np.int64(image[i, j, 1]) - g) <= tolerance and abs(np.int64(image[i, j, 2]) - r) <= tolerance:
+                    image[i, j, 0] = 0
+                    image[i, j, 1] = 0
+                    image[i, j, 2] = 0
+
+    return _zero_color
+
+
+def remove_color_from_image(image_path, target_color, output_path, tolerance=1):
     """
     Removes all pixels of a given color from an image and saves the result.
 
@@ -352,6 +589,7 @@ def remove_color_from_image(image_path, target_color, output_path):
         image_path (str): Path to the input image.
         target_color (tuple): The BGR color to remove (e.g., (255, 255, 255) for white).
         output_path (str): Path to save the modified image.
+        tolerance (int): Maximum per-channel difference from target_color still removed; 0 removes the exact color only. (Default: 1)
     """
     # Load the image
     image = cv2.imread(image_path)
@@ -361,13 +599,24 @@ def remove_color_from_image(image_path, target_color, output_path):
     # Convert the image to the desired color space if needed (e.g., BGR to HSV)
     # target_color should be in BGR format
 
-    # Create a mask for the target color
-    lower_bound = np.array(target_color) - 1  # Slight tolerance below the color
-    upper_bound = np.array(target_color) + 1  # Slight tolerance above the color
-    mask = cv2.inRange(image, lower_bound, upper_bound)
+    zero_color = _zero_color_kernel() if image.shape[0] * image.shape[1] >= _ZERO_COLOR_KERNEL_MIN_PIXELS else None
+    if zero_color is not None:
+        # Fused compare and assign on all cores (very large image, numba installed)
+        b, g, r = (int(channel) for channel in target_color)
+        zero_color(image, b, g, r, int(tolerance))
+    else:
+        # Create a boolean mask for the target color
+        if tolerance:
+            # cv2.inRange compares the uint8 image in place, without a widened copy. The bounds are clipped to the uint8 range
+            target = np.asarray(target_color, dtype=np.int64)
+            lower_bound = np.clip(target - tolerance, 0, 255)
+            upper_bound = np.clip(target + tolerance, 0, 255)
+            mask = cv2.inRange(image, lower_bound, upper_bound) != 0
+        else:
+            mask = np.all(image == np.asarray(target_color, dtype=image.dtype), axis=2)
 
-    # Remove the target color by setting it to black (or transparent)
-    image[mask == 255] = [0, 0, 0]  # Set the color to black
+        # Remove the target color by setting it to black (or transparent)
+        image[mask] = 0  # Set the color to black
 
     # Save the modified image
     cv2.imwrite(output_path, image)
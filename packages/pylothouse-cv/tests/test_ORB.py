@@ -0,0 +1,19 @@
+import pytest
+
+# ORB still imports the legacy nnmavutils/nnmavcv modules
+ORB = pytest.importorskip("pylothouse.cv.ORB")
+
+
+@pytest.mark.parametrize("use_npy_cache", [False, True])
+def test_load_ts_keypoints_from_unsorted_csv(tmp_path, use_npy_cache):
+    csv_path = tmp_path / "keypoints.csv"
+    csv_path.write_text("5,1,1,1,0,0,0,0\n"
+                        "3,2,2,1,0,0,0,0\n"
+                        "5,3,3,1,0,0,0,0\n"
+                        "4,4,4,1,0,0,0,0\n")
+
+    keypoints = ORB.load_ts_keypoints_from_csv(str(csv_path), use_npy_cache=use_npy_cache)
+    assert {ts: [kp.pt[0] for kp in kps] for ts, kps in keypoints.items()} == {3: [2], 4: [4], 5: [1, 3]}
+
+    keypoints = ORB.load_ts_keypoints_from_csv(str(csv_path), from_timestamp=4, to_timestamp=5, use_npy_cache=use_npy_cache)
+    assert {ts: [kp.pt[0] for kp in kps] for ts, kps in keypoints.items()} == {4: [4], 5: [1, 3]}
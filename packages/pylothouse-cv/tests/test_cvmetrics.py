@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from pylothouse.cv import cvmetrics
+
+
+@pytest.mark.parametrize("image", [
+    np.random.default_rng(0).integers(0, 256, size=(64, 48), dtype=np.uint8),
+    np.random.default_rng(1).integers(0, 65536, size=(64, 48, 3), dtype=np.uint16),
+    1e6 + np.random.default_rng(2).normal(0, 0.01, size=(64, 48)),
+    (1e4 + np.random.default_rng(3).normal(0, 0.01, size=(64, 48))).astype(np.float32),
+])
+def test_stdev_px_intensity_matches_np_std(image):
+    expected = np.std(image)
+    assert cvmetrics.stdev_px_intensity(image, precision=12) == pytest.approx(expected, rel=1e-6)
+    assert cvmetrics.image_stats(image, precision=12)['stdev_px_intensity'] == pytest.approx(expected, rel=1e-6)
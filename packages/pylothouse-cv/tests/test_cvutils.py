@@ -0,0 +1,9 @@
+from pylothouse.cv import cvutils
+
+
+def test_iter_image_paths_accepts_a_single_extension(tmp_path):
+    for name in ("a.png", "b.JPG", "c.txt"):
+        (tmp_path / name).touch()
+
+    assert sorted(map(str, cvutils.iter_image_paths(tmp_path, '.png'))) == [str(tmp_path / "a.png")]
+    assert sorted(map(str, cvutils.iter_image_paths(tmp_path, ('.png', '.jpg')))) == [str(tmp_path / "a.png"), str(tmp_path / "b.JPG")]
@@ -1,11 +1,11 @@
 import os
+import json
+from collections import namedtuple
+from functools import lru_cache
 
 import dash
 from dash import dcc, html
-import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output
-from dash import dash_table
-import plotly.graph_objs as go
+from dash.dependencies import Input, Output, State
 
 '''
 To use the dashboard:
@@ -19,6 +19,70 @@ To use the dashboard:
 '''
 
 
+@lru_cache(maxsize=4096)
+def _path_relative_to_assets_folder(path):
+    '''
+    Convert a single path to be relative to the assets folder (see paths_relative_to_assets_folder).
+    Results are cached, as the same image paths are converted again on every rebuild of sliders and images.
+    '''
+    if path.startswith('/assets'):
+        return path
+    # A single scan finds the assets folder and splits the path at it
+    _, assets, rest = path.partition('/assets')
+    if assets:
+        return assets + rest
+    # Absolute paths are kept as they are, as os.path.join('/assets', path) did
+    if path.startswith('/'):
+        return path
+    return '/assets/' + path
+
+
+# Tables with more rows than this are paginated on the server by PageComponent.table
+_TABLE_SERVER_PAGING_ROWS = 50000
+_TABLE_PAGE_SIZE = 100
+
+# Scatter traces with more points than this are rendered with WebGL (scattergl) by PageComponent.plotly_figure
+_SCATTERGL_MIN_POINTS = 2000
+
+
+@lru_cache(maxsize=None)
+def _dbc():
+    '''
+    Import dash_bootstrap_components on first use, so importing this module does not pay for it up front.
+    '''
+    import dash_bootstrap_components as dbc
+    return dbc
+
+
+def _scatter_to_scattergl(figure):
+    '''
+    Return a copy of the figure where scatter traces with more than _SCATTERGL_MIN_POINTS points are scattergl traces.
+    Properties that scattergl does not support (e.g. spline lines) are dropped from the converted traces.
+    The figure is returned unchanged if no trace is converted.
+    '''
+    import plotly.graph_objs as go
+
+    traces = []
+    converted = False
+    for trace in figure.data:
+        points = trace.x if trace.x is not None else trace.y
+        if isinstance(trace, go.Scatter) and points is not None and len(points) > _SCATTERGL_MIN_POINTS:
+            trace = go.Scattergl(trace.to_plotly_json(), skip_invalid=True)
+            converted = True
+        traces.append(trace)
+    if not converted:
+        return figure
+    return go.Figure(data=traces, layout=figure.layout)
+
+
+def _dataframe_records(data):
+    '''
+    Equivalent of data.to_dict('records'), built from plain row tuples zipped with the column names once per row.
+    '''
+    columns = tuple(data.columns)
+    return [dict(zip(columns, row)) for row in data.itertuples(index=False, name=None)]
+
+
 def paths_relative_to_assets_folder(paths):
     '''
     Convert the given paths to be relative to the assets folder.
@@ -33,18 +97,31 @@ def paths_relative_to_assets_folder(paths):
     Returns:
     relative_paths: list, the paths relative to the assets folder
     '''
-    relative_paths = []
-    for path in paths:
-        if not path.startswith('/assets'):
-            if '/assets' in path:
-                path = path[path.index('/assets'):]
-            else:
-                path = os.path.join('/assets', path)
-        relative_paths.append(path)
-    return relative_paths
+    return [_path_relative_to_assets_folder(path) for path in paths]
+
+
+# Entry of a PageComponent's callback store. Either function (server side) or clientside_function (JavaScript source) is set
+Callback = namedtuple('Callback', 'outputs inputs function prevent_initial_call state clientside_function',
+                      defaults=(None, False, (), None))
+
+
+def _register_callback(app, callback):
+    '''
+    Register one entry of a PageComponent's callback store on the app.
+    '''
+    if callback.clientside_function is not None:
+        app.clientside_callback(callback.clientside_function, callback.outputs, callback.inputs, list(callback.state))
+        return
+    app.callback(
+            callback.outputs,
+            callback.inputs,
+            prevent_initial_call=callback.prevent_initial_call
+        )(callback.function)
 
 
 class PageComponent:
+    __slots__ = ('id', 'title', 'child', 'show_title', '_callback_store', '_parent')
+
     def __init__(self, title, id, body, show_title=True):
         '''
         Create a page component with the given title and body
@@ -86,17 +163,13 @@ class PageComponent:
         self._parent = page
 
         # If the component is not in the children of the parent, add it
-        if page is not None and self not in page.children:
+        if page is not None and id(self) not in page._children_ids:
             page.add_component(self)
 
 
     def register_callbacks(self, app: dash.Dash):
         for callback in self._callback_store:
-            app.callback(
-                    callback['outputs'],
-                    callback['inputs'],
-                    prevent_initial_call=callback['prevent_initial_call']
-                )(callback['function'])
+            _register_callback(app, callback)
 
     def layout(self):
         divs = []
@@ -122,22 +195,54 @@ class PageComponent:
         Returns:
         table: dash_table.DataTable, the table with the given id and data
         '''
-        table = dash_table.DataTable(id=f'{id}-table', columns=[{"name": i, "id": i} for i in data.columns],
-                                     data=data.to_dict('records'))
-        return cls(title=title, id=id, body=table, show_title=show_title)
+        from dash import dash_table
+
+        columns = [{"name": i, "id": i} for i in data.columns]
+        n_rows = len(data)
+        if n_rows <= _TABLE_SERVER_PAGING_ROWS:
+            # Virtualized: all rows are sent, but only the visible ones are rendered in the browser
+            table = dash_table.DataTable(id=f'{id}-table', columns=columns, data=_dataframe_records(data),
+                                         virtualization=True, fixed_rows={'headers': True}, page_action='none',
+                                         style_table={'height': '600px', 'overflowY': 'auto'})
+            return cls(title=title, id=id, body=table, show_title=show_title)
+
+        # Large tables: only the current page is sent, sliced on the server when the page changes
+        table = dash_table.DataTable(id=f'{id}-table', columns=columns,
+                                     data=_dataframe_records(data.iloc[:_TABLE_PAGE_SIZE]),
+                                     page_action='custom', page_current=0, page_size=_TABLE_PAGE_SIZE,
+                                     page_count=-(-n_rows // _TABLE_PAGE_SIZE))
+        component = cls(title=title, id=id, body=table, show_title=show_title)
+
+        def update_table_page(page_current, page_size):
+            start = page_current * page_size
+            return _dataframe_records(data.iloc[start:start + page_size])
+
+        component._callback_store.append(
+            Callback(outputs=Output(f'{id}-table', 'data'),
+                     inputs=[Input(f'{id}-table', 'page_current'), Input(f'{id}-table', 'page_size')],
+                     function=update_table_page, prevent_initial_call=True))
+        return component
 
     @classmethod
-    def plotly_figure(cls, title, id, figure, show_title=True):
+    def plotly_figure(cls, title, id, figure, show_title=True, scattergl=True):
         '''
         Create a graph with the given id and figure
 
         Parameters:
         id: str, the id of the graph
         figure: dict, the figure of the graph (Pass the go.Scatter object)
+        scattergl: bool, render scatter traces of go.Figure objects with more than 2000 points with WebGL (scattergl) instead of SVG (default: True)
 
         Returns:
         graph: dcc.Graph, the graph with the given id and figure
         '''
+        import plotly.graph_objs as go
+        import plotly.io as pio
+
+        if scattergl and isinstance(figure, go.Figure):
+            figure = _scatter_to_scattergl(figure)
+        # Serialize the figure once here, so Dash only re-encodes a plain dict instead of walking the figure objects on every render
+        figure = json.loads(pio.to_json(figure, validate=False))
         graph = html.Div([dcc.Graph(id=f'{id}-figure', figure=figure)],
                          style={'minHeight': '600px', 'borderBottom': '2px solid black'})
         return cls(title=title, id=id, body=graph, show_title=show_title)
@@ -173,31 +278,41 @@ class PageComponent:
         slider: dcc.Slider, the image slider with the given id and images
         '''
         images = paths_relative_to_assets_folder(images)
+        n_images = len(images)
         if captions is None:
-            captions = [os.path.basename(images[i]) for i in range(len(images))]
+            captions = list(map(os.path.basename, images))
         title_div = html.H2(title)
-        image_div = html.Img(id='image')
+        image_div = html.Img(id=f'{id}-image')
         slider_output = html.Div(id=f'{id}-slider-output-container')
-        marks = {i: captions[i] if len(images) < 12 else '' for i in range(len(images))}
-        slider = dcc.Slider(id=f'{id}-slider', min=0, max=len(images), value=0, marks=marks, step=None)
+        # Captions are only shown as marks for small sliders
+        marks = dict(enumerate(captions[:n_images])) if n_images < 12 else dict.fromkeys(range(n_images), '')
+        slider = dcc.Slider(id=f'{id}-slider', min=0, max=n_images - 1, value=0, marks=marks, step=None)
         slider_div = html.Div([slider], style={'width': '90%', 'margin': 'auto'})
 
-        image_slider = html.Div([title_div, image_div, slider_output, slider_div], className="text-center",
+        # Captions and images are kept in the browser, so moving the slider needs no server roundtrip
+        slider_data = dcc.Store(id=f'{id}-slider-data', data={'captions': captions, 'images': images})
+
+        image_slider = html.Div([title_div, image_div, slider_output, slider_div, slider_data], className="text-center",
                                 style={'borderBottom': '2px solid black'})
 
         component = cls(title=title, id=id, body=image_slider, show_title=show_title)
 
-        # @page.dashboard.app.callback(
-        #     Output('slider-output-container', 'children'),
-        #     Output('image', 'src'),
-        #     [Input(id, 'value')]
-        # )
-        def update_output(value):
-            return 'img: "{}"'.format(captions[value]), images[value]
+        # The neighbouring frames are preloaded into the browser cache, so the next slider step shows without waiting for a GET
+        update_output = """
+        function(value, data) {
+            [value - 1, value + 1].forEach(function(i) {
+                if (i >= 0 && i < data.images.length) {
+                    new Image().src = data.images[i];
+                }
+            });
+            return ['img: "' + data.captions[value] + '"', data.images[value]];
+        }
+        """
 
         component._callback_store.append(
-            {'outputs': [Output(f'{id}-slider-output-container', 'children'), Output(f'image-{id}', 'src')],
-             'inputs': [Input({id}-slider, 'value')], 'function': update_output})
+            Callback(outputs=[Output(f'{id}-slider-output-container', 'children'), Output(f'{id}-image', 'src')],
+                     inputs=[Input(f'{id}-slider', 'value')], state=[State(f'{id}-slider-data', 'data')],
+                     clientside_function=update_output))
 
         return component
     
@@ -243,7 +358,7 @@ class PageComponent:
         inputs = [Input(f'{id}-button', 'n_clicks')]
         
         btn_component._callback_store.append(
-            {'outputs': [Output(component_id, 'children', allow_duplicate=allow_duplicate)], 'inputs': inputs, 'function': update_component_button_callback, 'prevent_initial_call': allow_duplicate})
+            Callback(outputs=[Output(component_id, 'children', allow_duplicate=allow_duplicate)], inputs=inputs, function=update_component_button_callback, prevent_initial_call=allow_duplicate))
         
         return btn_component
 
@@ -274,7 +389,7 @@ class PageComponent:
                 return 'No clicks yet'
             on_click()
         component._callback_store.append(
-            {'outputs': [], 'inputs': [Input(id, 'n_clicks')], 'function': action_button_callback})
+            Callback(outputs=[], inputs=[Input(id, 'n_clicks')], function=action_button_callback))
         return component
 
 
@@ -295,6 +410,9 @@ class Page:
     :type layout: str
     """
 
+    __slots__ = ('title', 'href', 'page_id', '_children', '_cached_main', '_children_ids', '_components_by_id',
+                 'subpages', '_cached_navbar', '_cached_title', '_dashboard', '_layout', '_show_title')
+
     def __init__(self, title, href, dashboard=None, children=None, subpages=None, layout='SIMPLE_ONE_COLUMN',
                  show_title: bool = True):
         self.title = title
@@ -304,26 +422,33 @@ class Page:
         # Children
         if children is None:
             children = []
-        self._children = children
         for child in children:
-            if isinstance(child, PageComponent):
-                self._children.append(child.layout())
-            else:
-                raise TypeError(f"{self.__name__} Children should be of type PageComponent")
+            if not isinstance(child, PageComponent):
+                raise TypeError(f"{type(self).__name__} Children should be of type PageComponent")
+        # Copy, so the caller's list is not aliased. Layouts are built at render time
+        self._children = list(children)
+        # Layout of the children, built on the first render and reset when the children change
+        self._cached_main = None
+        # id() index of the children for O(1) membership tests
+        self._children_ids = {id(child) for child in self._children}
+        # Components by their component id, for O(1) lookups by id. The first component with an id wins
+        self._components_by_id = {}
+        for child in self._children:
+            self._components_by_id.setdefault(child.id, child)
 
         # Subpages
         if subpages is None:
             subpages = []
-        self.subpages = subpages
         for subpage in subpages:
-            if isinstance(subpage, Page):
-                self.subpages.append(subpage)
-            else:
-                raise TypeError(f"{self.__name__} Subpages should be of type Page")
+            if not isinstance(subpage, Page):
+                raise TypeError(f"{type(self).__name__} Subpages should be of type Page")
+        self.subpages = list(subpages)
+        # Sub-navigation bar, built on the first render and reset when a subpage is added
+        self._cached_navbar = None
 
         if dashboard is not None:
             if not isinstance(dashboard, Dashboard):
-                raise TypeError(f"{self.__name__} dashboard should be of type Dashboard")
+                raise TypeError(f"{type(self).__name__} dashboard should be of type Dashboard")
         self._dashboard = dashboard
 
         if not layout in ['SIMPLE_ONE_COLUMN']:
@@ -331,6 +456,8 @@ class Page:
         self._layout = layout
 
         self._show_title = show_title
+        # Title node, built on the first render
+        self._cached_title = None
 
     @property
     def children(self):
@@ -350,20 +477,11 @@ class Page:
         self._dashboard = dashboard
 
         # If the page is not in the pages of the dashboard, add it
-        if self not in dashboard.pages and dashboard is not None:
+        if dashboard is not None and dashboard._pages.get(self.href) is not self:
             dashboard.add_page(self)
 
     def register_callbacks(self, app):
-        @app.callback(
-            Output(f'page-content-{self.page_id}', 'children'),
-            [Input('url', 'pathname')]
-        )
-        def display_page(pathname):
-            if pathname == self.href:
-                return self.layout()
-            else:
-                return html.Div()
-
+        # Routing is done by the dashboard-wide page-content callback (Dashboard.callback)
         for child in self._children:
             if isinstance(child, PageComponent):
                 child.register_callbacks(app)
@@ -371,25 +489,23 @@ class Page:
             subpage.register_callbacks(app)
 
     def layout(self):
-        title = html.H1(self.title) if self._show_title else None
-        sub_navbar = dbc.NavbarSimple(
-            children=[dbc.NavItem(dbc.NavLink(subpage.title, href=subpage.href)) for subpage in self.subpages],
-            brand=self.title,
-            brand_href=self.href,
-            color="dark",
-            dark=True,
-            className="p-2",  # Reduce padding to make it smaller
-            style={"font-size": "14px", "height": "38px", "margin": "0px"},  # Reduce font size and height
-            sticky="top",
-
-        )
-        main = html.Div(self._children)
-
         # TODO: Add more layouts.
         #  For now, only one column is supported, need something for a set of image and sliders for graphs
-        if self._layout == 'SIMPLE_ONE_COLUMN':  # Default one column layout
-            title = html.H1(self.title) if self._show_title else None
-            sub_navbar = dbc.NavbarSimple(
+        # Default one column layout ('SIMPLE_ONE_COLUMN')
+        if self._show_title and self._cached_title is None:
+            self._cached_title = html.H1(self.title)
+        layout = html.Div([
+            self._cached_title,
+            self._sub_navbar(),
+            self._main_layout()
+        ])
+
+        return layout
+
+    def _sub_navbar(self):
+        if self._cached_navbar is None:
+            dbc = _dbc()
+            self._cached_navbar = dbc.NavbarSimple(
                 children=[dbc.NavItem(dbc.NavLink(subpage.title, href=subpage.href)) for subpage in self.subpages],
                 brand=self.title,
                 brand_href=self.href,
@@ -398,39 +514,39 @@ class Page:
                 className="p-2",  # Reduce padding to make it smaller
                 style={"font-size": "14px", "height": "38px", "margin": "0px"},  # Reduce font size and height
                 sticky="top",
-
             )
-            main = html.Div([child.layout() for child in self._children])
+        return self._cached_navbar
 
-        layout = html.Div([
-            title,
-            sub_navbar,
-            main
-        ])
-
-        return layout    
+    def _main_layout(self):
+        if self._cached_main is None:
+            self._cached_main = html.Div([child.layout() if isinstance(child, PageComponent) else child for child in self._children])
+        return self._cached_main
 
     def fetch_component(self, component_id):
-        return next((comp for comp in self._children if comp.id == component_id), None)
+        return self._components_by_id.get(component_id)
 
     def add_subpage(self, page):
         if not isinstance(page, Page):
             raise TypeError("The subpage should be of type Page")
         if page not in self.subpages:
             self.subpages.append(page)
+            self._cached_navbar = None
 
     def add_component(self, component_or_id):
         if isinstance(component_or_id, PageComponent):
             component = component_or_id
         elif isinstance(component_or_id, str):
-            component = next((comp for comp in self._children if comp.id == component_or_id), None)
+            component = self._components_by_id.get(component_or_id)
             if component is None:
                 raise ValueError(f"No component found with id: {component_or_id}")
         else:
             raise TypeError("Input should be either a PageComponent instance or a component id string")
 
-        if component not in self._children:
+        if id(component) not in self._children_ids:
             self._children.append(component)
+            self._children_ids.add(id(component))
+            self._components_by_id.setdefault(component.id, component)
+            self._cached_main = None
         # Set the parent of the component to this page if it's not already set
         if component.parent is None or component.parent != self:
             component.parent = self
@@ -443,15 +559,19 @@ class Page:
         if isinstance(component_or_id, PageComponent):
             component = component_or_id
         elif isinstance(component_or_id, str):
-            component = next((comp for comp in self._children if comp.id == component_or_id), None)
+            component = self._components_by_id.get(component_or_id)
             if component is None:
                 print(f"No component found with id: {component_or_id}")
                 return
         else:
             raise TypeError("Input should be either a PageComponent instance or a component id string")
 
-        if component in self._children:
+        if id(component) in self._children_ids:
             self._children.remove(component)
+            self._children_ids.discard(id(component))
+            if self._components_by_id.get(component.id) is component:
+                del self._components_by_id[component.id]
+            self._cached_main = None
             del component
         else:
             print(f"Component: {component.title} not in page: {self.title}")
@@ -459,8 +579,11 @@ class Page:
     def add_components(self, components):
         for component in components:
             if isinstance(component, PageComponent):
-                if component not in self._children:
+                if id(component) not in self._children_ids:
                     self._children.append(component)
+                    self._children_ids.add(id(component))
+                    self._components_by_id.setdefault(component.id, component)
+                    self._cached_main = None
                 # Set the parent of the component to this page if it's not already set
                 if component.parent is None and component.parent != self:
                     component.parent = self
@@ -481,23 +604,38 @@ class Page:
 
     def add_div_child(self, child):
         self._children.append(child)
+        self._children_ids.add(id(child))
+        self._cached_main = None
 
 
 class Dashboard:
     def __init__(self, title='Dashboard', assets_folder='/assets'):
-        self.app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True,
+        self.app = dash.Dash(__name__, external_stylesheets=[_dbc().themes.BOOTSTRAP], suppress_callback_exceptions=True,
                              assets_folder=assets_folder)
         self.title = title
         self.current_path = '/'
-        self.pages = []
+        # Pages by href, in insertion order, for O(1) membership tests and removal
+        self._pages = {}
+        # App layout, built on the first call to layout() and reset when the pages change
+        self._cached_layout = None
+
+    @property
+    def pages(self):
+        return list(self._pages.values())
+
+    def _insert_page(self, page):
+        existing = self._pages.setdefault(page.href, page)
+        if existing is page:
+            self._cached_layout = None
+        else:
+            raise ValueError(f"Dashboard: {self.title} already has a page with href: {page.href}")
 
     def add_page(self, page: Page):
         '''
         Add a page to the dashboard.
         The page should be of type Page
         '''
-        if page not in self.pages:
-            self.pages.append(page)
+        self._insert_page(page)
         # Set the dashboard of the page to this dashboard only if it's not already set
         if page.dashboard is None or page.dashboard != self:
             page.dashboard = self
@@ -508,8 +646,9 @@ class Dashboard:
         :param page: Page, the page to be removed
         Returns:
         """
-        if page in self.pages:
-            self.pages.remove(page)
+        if self._pages.get(page.href) is page:
+            del self._pages[page.href]
+            self._cached_layout = None
             page.dashboard = None
         else:
             print(f"Page: {page.title} not in Dashboard: {self.title}")
@@ -520,8 +659,7 @@ class Dashboard:
         '''
         for page in pages:
             if isinstance(page, Page):
-                if page not in self.pages:
-                    self.pages.append(page)
+                self._insert_page(page)
                 # Set the dashboard of the page to this dashboard only if it's not already set
                 if page.dashboard is None or page.dashboard != self:
                     page.dashboard = self
@@ -529,8 +667,9 @@ class Dashboard:
                 raise ValueError("The pages should be of type Page")
 
     def navbar(self):
+        dbc = _dbc()
         navbar = dbc.NavbarSimple(
-            children=[dbc.NavItem(dbc.NavLink(page.title, href=page.href)) for page in self.pages],
+            children=[dbc.NavItem(dbc.NavLink(page.title, href=page.href)) for page in self._pages.values()],
             brand=self.title,
             brand_href="/",
             sticky="top",
@@ -538,40 +677,65 @@ class Dashboard:
         return navbar
 
     def layout(self):
-        layout = html.Div([
-            dcc.Location(id='url', refresh=False),
-            self.navbar(),
-            html.Div(id='breadcrumb-container', style={
-                "margin": "0px",  # Adjust based on the height of your navbar
-                "padding-left": "10px",
-                "font-size": "14px",
-            }),
-            html.Div(id='page-content')
-        ])
-        return layout
+        if self._cached_layout is None:
+            self._cached_layout = html.Div([
+                dcc.Location(id='url', refresh=False),
+                self.navbar(),
+                html.Div(id='breadcrumb-container', style={
+                    "margin": "0px",  # Adjust based on the height of your navbar
+                    "padding-left": "10px",
+                    "font-size": "14px",
+                }),
+                html.Div(id='page-content')
+            ])
+        return self._cached_layout
+
+    @staticmethod
+    def _walk_pages(pages):
+        '''
+        Iterate over the given pages and all their subpages, each page before its subpages (depth-first, in order), without recursion.
+        '''
+        stack = list(reversed(pages))
+        while stack:
+            page = stack.pop()
+            yield page
+            stack.extend(reversed(page.subpages))
 
     def recursive_fetch_page(self, pathname, page):
-        if pathname == page.href:
-            return page.layout()
-        for subpage in page.subpages:
-            if pathname == subpage.href:
-                return subpage.layout()
-            else:
-                layout = self.recursive_fetch_page(pathname, subpage)
-                if layout is not None:
-                    return layout
+        for candidate in self._walk_pages([page]):
+            if pathname == candidate.href:
+                return candidate.layout()
         return None
 
+    def _collect_callbacks(self):
+        '''
+        Collect the callback store entries of all components of all pages and subpages in one flat pass.
+        A component shared by several pages is collected once, so its callbacks are not registered twice.
+        '''
+        callbacks = []
+        collected = set()
+        for page in self._walk_pages(list(self._pages.values())):
+            for child in page.children:
+                if isinstance(child, PageComponent) and id(child) not in collected:
+                    collected.add(id(child))
+                    callbacks.extend(child._callback_store)
+        return callbacks
+
     def callback(self):
+        # Map every pathname to its page once, so a URL change is a single dict lookup.
+        # The first page found for a pathname wins (pages in order, each before its subpages)
+        self._route_table = {}
+        for page in self._walk_pages(list(self._pages.values())):
+            self._route_table.setdefault(page.href, page)
+
         @self.app.callback(Output('page-content', 'children'),
                            [Input('url', 'pathname')])
         def display_page(pathname):
             print("Dashboard app Callback")
-            for page in self.pages:
-                layout = self.recursive_fetch_page(pathname, page)
-                if layout is not None:
-                    self.current_path = pathname
-                    return layout
+            page = self._route_table.get(pathname)
+            if page is not None:
+                self.current_path = pathname
+                return page.layout()
             print("Page not found. Pathname: ", pathname)
 
         @self.app.callback(Output('breadcrumb-container', 'children'),
@@ -594,10 +758,10 @@ class Dashboard:
                     # Previous pages, with links
                     breadcrumbs.append({"label": path_parts[i], "href": href})
 
-            return dbc.Breadcrumb(items=breadcrumbs)
+            return _dbc().Breadcrumb(items=breadcrumbs)
 
-        for page in self.pages:
-            page.register_callbacks(self.app)
+        for callback in self._collect_callbacks():
+            _register_callback(self.app, callback)
 
     def run(self, debug=False):
         self.app.layout = self.layout()
@@ -1,99 +1,175 @@
 import argparse
+from functools import lru_cache
+
 import numpy as np
-from pyrr import Vector3
 
 
 def check_coordinate_system(matrix):
-    # Ensure the matrix is a numpy array
-    matrix = np.array(matrix)
+    # Ensure the matrix is a numpy array (no copy if it already is one)
+    matrix = np.asarray(matrix)
 
     # Check if the matrix is 4x4
     if matrix.shape != (4, 4):
         raise ValueError("Input matrix must be 4x4")
 
-    # Extract the rotation part of the matrix
-    rotation_matrix = matrix[:3, :3]
+    # Extract the rotation part of the matrix as Python floats
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = matrix[:3, :3].tolist()
 
-    # Calculate the determinant of the rotation matrix
-    determinant = np.linalg.det(rotation_matrix)
+    # Calculate the determinant of the rotation matrix (scalar triple product)
+    determinant = m00 * (m11 * m22 - m12 * m21) - m01 * (m10 * m22 - m12 * m20) + m02 * (m10 * m21 - m11 * m20)
 
-    # Check the determinant
-    if np.isclose(determinant, 1):
+    # Check the determinant (same tolerance as np.isclose around +-1)
+    if abs(determinant - 1.0) <= 1e-5:
         return "Right-handed"
-    elif np.isclose(determinant, -1):
+    elif abs(determinant + 1.0) <= 1e-5:
         return "Left-handed"
     else:
         return "Invalid"
 
 
-def pose_to_homogeneous(q, t):
+def pose_to_homogeneous(q, t, dtype=np.float64):
     """
         Takes a quaternion (qw, qx, qy, qz) and a translation vector (px, py, pz) and returns a 4x4 homogeneous transformation matrix
     Args:
         q: The quaternion in the format (qw, qx, qy, qz)
         t: The translation vector in the format (px, py, pz)
+        dtype: Float type of the matrix, e.g. np.float32 to halve the memory traffic (Default: np.float64)
 
     Returns: 4x4 homogeneous transformation matrix with the 3x3 rotation matrix R and 3x1 translation vector t
     [R t]\n
     [0 1]
     """
     # Convert pose to homogeneous transformation
-    homo = q_to_homogeneous(q)
+    homo = q_to_homogeneous(q, dtype=dtype)
     homo[:3, 3] = t
     return homo
 
 
-def q_to_homogeneous(q):
+def _inv_se3(H, xp=np):
     """
-        Takes a quaternion [qw, qx, qy, qz] and returns a 4x4 homogeneous matrix with only the rotation part
+        Inverts rigid homogeneous transformations [R t; 0 1] analytically as [R^T -R^T t; 0 1], without a LAPACK call
+    Args:
+        H: 4x4 homogeneous matrix, or Nx4x4 array of homogeneous matrices
+        xp: Array module of H, numpy or cupy (Default: numpy)
+
+    Returns: The inverse matrix (or matrices) with the same shape as H
+    """
+    H = xp.asarray(H)
+    R_T = xp.swapaxes(H[..., :3, :3], -1, -2)
+    inverse = xp.zeros(H.shape, dtype=np.result_type(H.dtype, np.float32))
+    inverse[..., :3, :3] = R_T
+    inverse[..., :3, 3] = -xp.einsum('...ij,...j->...i', R_T, H[..., :3, 3])
+    inverse[..., 3, 3] = 1
+    return inverse
+
+
+def _q_to_homo(q0, q1, q2, q3, out):
+    """
+        Writes the 4x4 homogeneous matrix of the quaternion (q0, q1, q2, q3) = (qw, qx, qy, qz) into out.
+        Plain scalar code so that it runs as is without numba and compiles with numba when it is installed.
+    """
+    # First row of the rotation matrix
+    out[0, 0] = 2 * (q0 * q0 + q1 * q1) - 1
+    out[0, 1] = 2 * (q1 * q2 - q0 * q3)
+    out[0, 2] = 2 * (q1 * q3 + q0 * q2)
+
+    # Second row of the rotation matrix
+    out[1, 0] = 2 * (q1 * q2 + q0 * q3)
+    out[1, 1] = 2 * (q0 * q0 + q2 * q2) - 1
+    out[1, 2] = 2 * (q2 * q3 - q0 * q1)
+
+    # Third row of the rotation matrix
+    out[2, 0] = 2 * (q1 * q3 - q0 * q2)
+    out[2, 1] = 2 * (q2 * q3 + q0 * q1)
+    out[2, 2] = 2 * (q0 * q0 + q3 * q3) - 1
+
+    # No translation
+    out[0, 3] = 0.0
+    out[1, 3] = 0.0
+    out[2, 3] = 0.0
+    out[3, 0] = 0.0
+    out[3, 1] = 0.0
+    out[3, 2] = 0.0
+    out[3, 3] = 1.0
+
+
+@lru_cache(maxsize=None)
+def _q_to_homo_kernels():
+    """
+        Compiles (on first use) the numba kernels of _q_to_homo for a single quaternion and for a batch of quaternions.
+
+    Returns: The kernels (q_to_homo(q0, q1, q2, q3, out), q_to_homo_batch(qs, outs)), or None if numba is not installed.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    q_to_homo = numba.njit(cache=True, fastmath=True)(_q_to_homo)
+
+    @numba.njit(parallel=True, fastmath=True)
+    def _q_to_homo_batch(qs, outs):
+        for i in numba.prange(qs.shape[0]):
+            q_to_homo(qs[i, 0], qs[i, 1], qs[i, 2], qs[i, 3], outs[i])
+
+    return q_to_homo, _q_to_homo_batch
+
+
+def q_to_homogeneous(q, out=None, dtype=np.float64):
+    """
+        Takes a quaternion [qw, qx, qy, qz] and returns a 4x4 homogeneous matrix with only the rotation part.
+        Every entry is quadratic in the quaternion, so q and -q give the same matrix; callers that need a canonical sign should canonicalize the quaternion themselves.
     Args:
         q: The quaternion in the format (qw, qx, qy, qz)
+        out: Optional 4x4 float array to write the matrix into instead of allocating a new one
+        dtype: Float type of the allocated matrix when out is not given (Default: np.float64)
 
     Returns: 4x4 homogeneous transformation matrix with only the 3x3 rotation matrix R
     \n
     [R 0]
-    [0 0]
+    [0 1]
     """
-    # Convert quaternion to homogeneous transformation matrix
-
     # Extract the values from Q
     q0 = q[0]
     q1 = q[1]
     q2 = q[2]
     q3 = q[3]
-    if (q0 > 0):
-        q0, q1, q2, q3 = -q0, -q1, -q2, -q3
-
-    # First row of the rotation matrix
-    r00 = 2 * (q0 * q0 + q1 * q1) - 1
-    r01 = 2 * (q1 * q2 - q0 * q3)
-    r02 = 2 * (q1 * q3 + q0 * q2)
 
-    # Second row of the rotation matrix
-    r10 = 2 * (q1 * q2 + q0 * q3)
-    r11 = 2 * (q0 * q0 + q2 * q2) - 1
-    r12 = 2 * (q2 * q3 - q0 * q1)
-
-    # Third row of the rotation matrix
-    r20 = 2 * (q1 * q3 - q0 * q2)
-    r21 = 2 * (q2 * q3 + q0 * q1)
-    r22 = 2 * (q0 * q0 + q3 * q3) - 1
+    if out is None:
+        out = np.empty((4, 4), dtype=dtype)
+    kernels = _q_to_homo_kernels()
+    if kernels is not None:
+        kernels[0](float(q0), float(q1), float(q2), float(q3), out)
+    else:
+        _q_to_homo(q0, q1, q2, q3, out)
+    return out
 
-    # Uncomment below to change the sign of the rotation matrix
-    # r00, r11, r22 = -r00, -r11, -r22
 
-    # 3x3 rotation matrix
-    rot_matrix = np.array([[r00, r01, r02],
-                           [r10, r11, r12],
-                           [r20, r21, r22]])
-    # print(rot_matrix)
+def _q_to_homo_batch(quaternions, outs=None, dtype=np.float64):
+    """
+        Batched q_to_homogeneous for N quaternions
+    Args:
+        quaternions: Nx4 array of quaternions in the format (qw, qx, qy, qz)
+        outs: Optional Nx4x4 float array to write the matrices into instead of allocating a new one
+        dtype: Float type of the computation (Default: np.float64)
 
-    homo = np.eye(4)
-    homo[:3, :3] = rot_matrix
-    return homo
+    Returns: Nx4x4 array of homogeneous matrices with only the rotation part
+    """
+    quaternions = np.ascontiguousarray(quaternions, dtype=dtype)
+    if outs is None:
+        outs = np.empty((len(quaternions), 4, 4), dtype=dtype)
+    kernels = _q_to_homo_kernels()
+    if kernels is not None:
+        kernels[1](quaternions, outs)
+    else:
+        outs[:, :3, :3] = _q_to_rotation_batch(quaternions)
+        outs[:, :3, 3] = 0
+        outs[:, 3, :3] = 0
+        outs[:, 3, 3] = 1
+    return outs
 
 
-def homogeneous_to_q(m):
+def homogeneous_to_q(m, dtype=np.float64):
     """
         Takes a homogeneous matrix with a 3x3 Rotation matrix and outputs the quaternion from that rotation matrix.
         This function works with the rotation matrix being at the to pleft of the homogenous matrix like:\n
@@ -101,35 +177,65 @@ def homogeneous_to_q(m):
         [... ...]
     Args:
         m: The homogeneous matrix
+        dtype: Float type of the computation (Default: np.float64)
 
     Returns: The quaternion in the format [qw, qx, qy, qz].
 
     """
-    tr = m[0][0] + m[1][1] + m[2][2]
+    m = np.asarray(m, dtype=dtype)
+    out = np.empty(4, dtype=m.dtype)
+    kernels = _scalar_kernels()
+    if kernels is not None:
+        kernels[0](m, out)
+    else:
+        _homogeneous_to_q(m, out)
+    return list(out)
+
 
-    if tr > 0:
-        S = ((tr + 1.0) ** 0.5) * 2  # S=4*qw
+def _homogeneous_to_q(m, out):
+    """
+        Writes the quaternion (qw, qx, qy, qz) of the rotation matrix at the top left of m into out.
+        Plain scalar code so that it runs as is without numba and compiles with numba when it is installed.
+    """
+    m00, m01, m02 = m[0, 0], m[0, 1], m[0, 2]
+    m10, m11, m12 = m[1, 0], m[1, 1], m[1, 2]
+    m20, m21, m22 = m[2, 0], m[2, 1], m[2, 2]
+    tr = m00 + m11 + m22
+
+    # Shepperd's method: use the formula with the largest denominator (4*qw, 4*qx, 4*qy or 4*qz),
+    # which is never smaller than 1 for a rotation matrix, so the sqrt and the division are always well conditioned
+    k = 0
+    d = 1.0 + tr
+    if 1.0 + m00 - m11 - m22 > d:
+        k = 1
+        d = 1.0 + m00 - m11 - m22
+    if 1.0 + m11 - m00 - m22 > d:
+        k = 2
+        d = 1.0 + m11 - m00 - m22
+    if 1.0 + m22 - m00 - m11 > d:
+        k = 3
+        d = 1.0 + m22 - m00 - m11
+    S = (d ** 0.5) * 2
+
+    if k == 0:  # S=4*qw
         qw = 0.25 * S
-        qx = (m[2][1] - m[1][2]) / S
-        qy = (m[0][2] - m[2][0]) / S
-        qz = (m[1][0] - m[0][1]) / S
-    elif (m[0][0] > m[1][1]) and (m[0][0] > m[2][2]):
-        S = ((1.0 + m[0][0] - m[1][1] - m[2][2]) ** 0.5) * 2  # S=4*qx
-        qw = (m[2][1] - m[1][2]) / S
+        qx = (m21 - m12) / S
+        qy = (m02 - m20) / S
+        qz = (m10 - m01) / S
+    elif k == 1:  # S=4*qx
+        qw = (m21 - m12) / S
         qx = 0.25 * S
-        qy = (m[0][1] + m[1][0]) / S
-        qz = (m[0][2] + m[2][0]) / S
-    elif m[1][1] > m[2][2]:
-        S = ((1.0 + m[1][1] - m[0][0] - m[2][2]) ** 0.5) * 2  # S=4*qy
-        qw = (m[0][2] - m[2][0]) / S
-        qx = (m[0][1] + m[1][0]) / S
+        qy = (m01 + m10) / S
+        qz = (m02 + m20) / S
+    elif k == 2:  # S=4*qy
+        qw = (m02 - m20) / S
+        qx = (m01 + m10) / S
         qy = 0.25 * S
-        qz = (m[1][2] + m[2][1]) / S
-    else:
-        S = ((1.0 + m[2][2] - m[0][0] - m[1][1]) ** 0.5) * 2  # S=4*qz
-        qw = (m[1][0] - m[0][1]) / S
-        qx = (m[0][2] + m[2][0]) / S
-        qy = (m[1][2] + m[2][1]) / S
+        qz = (m12 + m21) / S
+    else:  # S=4*qz
+        qw = (m10 - m01) / S
+        qx = (m02 + m20) / S
+        qy = (m12 + m21) / S
         qz = 0.25 * S
 
     if (qw < 0):  # Change the quaternion sign if qw is negative to match the format of the output data
@@ -137,7 +243,77 @@ def homogeneous_to_q(m):
         qx = -qx
         qy = -qy
         qz = -qz
-    return [qw, qx, qy, qz]
+    out[0] = qw
+    out[1] = qx
+    out[2] = qy
+    out[3] = qz
+
+
+def _q_to_rotation_batch(quaternions, xp=np):
+    """
+        Vectorized q_to_homogeneous for N quaternions, returning only the rotation matrices
+    Args:
+        quaternions: Nx4 array of quaternions in the format (qw, qx, qy, qz)
+        xp: Array module of quaternions, numpy or cupy (Default: numpy)
+
+    Returns: Nx3x3 array of rotation matrices
+    """
+    q0, q1, q2, q3 = quaternions.T
+    rot_matrices = xp.empty((len(quaternions), 3, 3), dtype=np.result_type(quaternions.dtype, np.float32))
+
+    # First row of the rotation matrices
+    rot_matrices[:, 0, 0] = 2 * (q0 * q0 + q1 * q1) - 1
+    rot_matrices[:, 0, 1] = 2 * (q1 * q2 - q0 * q3)
+    rot_matrices[:, 0, 2] = 2 * (q1 * q3 + q0 * q2)
+
+    # Second row of the rotation matrices
+    rot_matrices[:, 1, 0] = 2 * (q1 * q2 + q0 * q3)
+    rot_matrices[:, 1, 1] = 2 * (q0 * q0 + q2 * q2) - 1
+    rot_matrices[:, 1, 2] = 2 * (q2 * q3 - q0 * q1)
+
+    # Third row of the rotation matrices
+    rot_matrices[:, 2, 0] = 2 * (q1 * q3 - q0 * q2)
+    rot_matrices[:, 2, 1] = 2 * (q2 * q3 + q0 * q1)
+    rot_matrices[:, 2, 2] = 2 * (q0 * q0 + q3 * q3) - 1
+    return rot_matrices
+
+
+def homogeneous_to_q_batch(matrices, xp=np):
+    """
+        Vectorized homogeneous_to_q for N matrices with the 3x3 rotation matrix at the top left.
+        The quaternions of all four cases of homogeneous_to_q are computed for every matrix and the right one is selected per matrix, without branches.
+    Args:
+        matrices: Nx3x3 (or Nx4x4) array of matrices
+        xp: Array module of matrices, numpy or cupy (Default: numpy)
+
+    Returns: Nx4 array of quaternions in the format [qw, qx, qy, qz].
+    """
+    m = xp.asarray(matrices)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    tr = m00 + m11 + m22
+
+    # S of every case, clamped so that the cases that are not selected do not produce NaN or divide by zero
+    S_w = xp.maximum(xp.sqrt(xp.maximum(tr + 1.0, 0)) * 2, 1e-20)  # S=4*qw
+    S_x = xp.maximum(xp.sqrt(xp.maximum(1.0 + m00 - m11 - m22, 0)) * 2, 1e-20)  # S=4*qx
+    S_y = xp.maximum(xp.sqrt(xp.maximum(1.0 + m11 - m00 - m22, 0)) * 2, 1e-20)  # S=4*qy
+    S_z = xp.maximum(xp.sqrt(xp.maximum(1.0 + m22 - m00 - m11, 0)) * 2, 1e-20)  # S=4*qz
+
+    # 4xNx4 candidate quaternions, one per case
+    candidates = xp.stack([
+        xp.stack([0.25 * S_w, (m21 - m12) / S_w, (m02 - m20) / S_w, (m10 - m01) / S_w], axis=1),
+        xp.stack([(m21 - m12) / S_x, 0.25 * S_x, (m01 + m10) / S_x, (m02 + m20) / S_x], axis=1),
+        xp.stack([(m02 - m20) / S_y, (m01 + m10) / S_y, 0.25 * S_y, (m12 + m21) / S_y], axis=1),
+        xp.stack([(m10 - m01) / S_z, (m02 + m20) / S_z, (m12 + m21) / S_z, 0.25 * S_z], axis=1),
+    ])
+
+    # Case of every matrix: the largest denominator, as in homogeneous_to_q
+    case = xp.argmax(xp.stack([tr, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11]), axis=0)
+    quaternions = xp.take_along_axis(candidates, case[None, :, None], axis=0)[0]
+
+    # Change the quaternion sign if qw is negative to match the format of the output data
+    return xp.where(quaternions[:, :1] < 0, -quaternions, quaternions)
 
 
 def relative_rotation(q1, q2):
@@ -177,31 +353,31 @@ def rotate_quaternion(quaternion, rotation_quaternion):
     return rotated_quaternion
 
 
-def rotate_xyz(xyz, quaternion):
+def rotate_xyz(xyz, quaternion=None, R=None):
     """
-    Rotate the acceleration vector using the quaternion
+    Rotate the acceleration vector using the unit quaternion, with the quaternion sandwich q * v * q^-1 written as
+    v' = v + qw * t + u x t, where u = (qx, qy, qz) and t = 2 * (u x v). No rotation matrix is built.
+    If the rotation matrix of the quaternion is already available it can be passed as R instead, and v' = R * v.
 
     Args:
-    - xyz: 1x3 numpy array (ax, ay, az)
-    - quaternion: 4x1 numpy array (qw, qx, qy, qz)
+    - xyz: 1x3 numpy array (ax, ay, az), or Nx3 array of vectors
+    - quaternion: 4x1 numpy array (qw, qx, qy, qz), or Nx4 array of quaternions (one per vector)
+    - R: 3x3 rotation matrix, or Nx3x3 array of rotation matrices, used instead of the quaternion (Default: None)
 
     Returns:
-    - rotated_xyz: 3x1 numpy array (ax, ay, az)
+    - rotated_xyz: 3x1 numpy array (ax, ay, az), or Nx3 array of rotated vectors
     """
-    # Transpose the xyz vector
-    xyz = np.array(xyz).reshape(3, 1)
-    rot_matrix = q_to_homogeneous(quaternion)[:3, :3]
+    xyz = np.asarray(xyz, dtype=np.float64)
+    if R is not None:
+        return np.einsum('...ij,...j->...i', R, xyz)
 
-    # Rotate the acceleration vector
-    rotated_xyz = np.dot(rot_matrix, xyz)  # a_2 = R * a_1, where:
-    # xyz is the original 1x3 xyz vector transposed to 3x1,
-    # rot_matrix is the 3x3 rotation matrix derived by the quaternion
-    # rotated_xyz is the 3x1 rotated xyz vector
+    quaternion = np.asarray(quaternion, dtype=np.float64)
+    qw = quaternion[..., :1]
+    u = quaternion[..., 1:4]
 
-    # Return the rotated xyz vector
-    rotated_xyz = rotated_xyz.reshape(1, 3)
+    t = 2.0 * np.cross(u, xyz)
+    return xyz + qw * t + np.cross(u, t)
 
-    return rotated_xyz.flatten()
 
 def angular_acceleration(angular_velocity, angular_velocity_next, delta_t):
     """
@@ -228,114 +404,349 @@ def a_rot(ang_vel, ang_accel, accelerometer_offset):
         ang_vel: The angular velocity of the device in the format (wx, wy, wz)
         ang_accel: The angular acceleration of the device in the format (w'x, w'y, w'z)
         accelerometer_offset: The offset of the accelerometer in the format (tx, ty, tz)
+        (Each argument can also be an Nx3 array, e.g. one row per sample)
 
     Returns:
         The acceleration caused by rotation around a point with offset: accelerometer_offset
     """
-    a_rot = np.cross(ang_accel, accelerometer_offset) + np.cross(ang_vel, np.cross(ang_vel, accelerometer_offset))
+    w0, w1, w2 = np.moveaxis(np.asarray(ang_vel), -1, 0)
+    a0, a1, a2 = np.moveaxis(np.asarray(ang_accel), -1, 0)
+    t0, t1, t2 = np.moveaxis(np.asarray(accelerometer_offset), -1, 0)
+
+    # w x t, shared by the outer cross product
+    wt0 = w1 * t2 - w2 * t1
+    wt1 = w2 * t0 - w0 * t2
+    wt2 = w0 * t1 - w1 * t0
+
+    # w' x t + w x (w x t)
+    a_rot = np.stack([a1 * t2 - a2 * t1 + w1 * wt2 - w2 * wt1,
+                      a2 * t0 - a0 * t2 + w2 * wt0 - w0 * wt2,
+                      a0 * t1 - a1 * t0 + w0 * wt1 - w1 * wt0], axis=-1)
     return a_rot
 
 
-def transform_poses(poses, extrinsic_calibration, inverse_calibration=False, debug=False):
+def _scaled_term(coefficient, term):
+    """
+    Source of coefficient * term with the coefficient inlined as a literal, or None if the coefficient is zero
+    """
+    if coefficient == 0:
+        return None
+    if coefficient == 1:
+        return term
+    if coefficient == -1:
+        return f"-{term}"
+    return f"{float(coefficient)!r} * {term}"
+
+
+# Generating and compiling the fused kernel takes around a second per calibration and cannot be cached to disk,
+# so it is only used for batches large enough to earn that back
+_FUSED_TRANSFORM_MIN_POSES = 1_000_000
+
+
+@lru_cache(maxsize=32)
+def _fused_transform_kernel(calibration_bytes):
+    """
+        Generates and compiles (on first use for every extrinsic calibration) a numba kernel that fuses the quaternion to
+        rotation matrix conversion of every pose with the multiplication by that fixed calibration, so the pose matrices
+        are never written to memory. The calibration entries are inlined as constants: products with 0 are dropped and
+        products with 1 or -1 become plain additions or subtractions, which removes most of the work for the common
+        axis-swap and pure-rotation calibrations.
+    Args:
+        calibration_bytes: The 4x4 float64 extrinsic calibration as bytes (hashable, so the kernels are cached per calibration)
+
+    Returns: The kernel fused_transform(positions, quaternions, inverse_calibration, out), writing ([R p; 0 1] @ E) for every pose into out,
+    with R transposed when inverse_calibration is True, or None if numba is not installed.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    E = np.frombuffer(calibration_bytes, dtype=np.float64).reshape(4, 4)
+    rows = (("r00", "r01", "r02", "p0"), ("r10", "r11", "r12", "p1"), ("r20", "r21", "r22", "p2"))
+    assignments = []
+    for a, row in enumerate(rows):
+        for b in range(4):
+            terms = [term for term in (_scaled_term(E[k, b], row[k]) for k in range(4)) if term is not None]
+            expression = " + ".join(terms).replace("+ -", "- ") if terms else "0.0"
+            assignments.append(f"        out[i, {a}, {b}] = {expression}")
+    for b in range(4):
+        assignments.append(f"        out[i, 3, {b}] = {float(E[3, b])!r}")
+
+    source = "\n".join([
+        "def _fused_transform(positions, quaternions, inverse_calibration, out):",
+        "    for i in numba.prange(quaternions.shape[0]):",
+        "        q0, q1, q2, q3 = quaternions[i, 0], quaternions[i, 1], quaternions[i, 2], quaternions[i, 3]",
+        "        p0, p1, p2 = positions[i, 0], positions[i, 1], positions[i, 2]",
+        # Rotation matrix of the pose, held in registers
+        "        r00 = 2 * (q0 * q0 + q1 * q1) - 1",
+        "        r11 = 2 * (q0 * q0 + q2 * q2) - 1",
+        "        r22 = 2 * (q0 * q0 + q3 * q3) - 1",
+        "        r01 = 2 * (q1 * q2 - q0 * q3)",
+        "        r10 = 2 * (q1 * q2 + q0 * q3)",
+        "        r02 = 2 * (q1 * q3 + q0 * q2)",
+        "        r20 = 2 * (q1 * q3 - q0 * q2)",
+        "        r12 = 2 * (q2 * q3 - q0 * q1)",
+        "        r21 = 2 * (q2 * q3 + q0 * q1)",
+        "        if inverse_calibration:",
+        "            r01, r10 = r10, r01",
+        "            r02, r20 = r20, r02",
+        "            r12, r21 = r21, r12",
+        # [R p; 0 1] @ E with the entries of E inlined
+        *assignments,
+    ])
+    namespace = {"numba": numba}
+    exec(source, namespace)
+    return numba.njit(parallel=True, fastmath=True)(namespace["_fused_transform"])
+
+
+def transform_poses(poses, extrinsic_calibration, inverse_calibration=False, debug=False, dtype=np.float64, pre_R=None, backend='numpy'):
     """
-    Transform poses using extrinsic calibration
+    Transform poses using extrinsic calibration. All poses are transformed at once with batched numpy operations.
 
     Args:
-    - quaternions: Nx4 numpy array (qw, qx, qy, qz)
-    - translations: Nx3 numpy array (px, py, pz)
+    - poses: NxM numpy array of poses in the format (px, py, pz, qw, qx, qy, qz, ...). Columns after the quaternion are copied unchanged
     - extrinsic_calibration: 4x4 numpy array
     - inverse_calibration: boolean, whether to apply the inverse calibration (Default: False)
-    - debug: boolean, whether to print debug information
+    - debug: boolean, whether to print debug information for the first pose
+    - dtype: float type of the computation and of the output, e.g. np.float32 to halve the memory traffic on large batches.
+      Reduced precision quaternions are renormalized before use (Default: np.float64)
+    - pre_R: Nx3x3 numpy array of the rotation matrices of the pose quaternions, if already computed, to skip the conversion (Default: None)
+    - backend: 'numpy' to run on the CPU, or 'cupy' to run the batched operations on a CUDA GPU for very long trajectories.
+      The cupy backend requires cupy to be installed; the result is returned as a numpy array either way (Default: 'numpy')
 
     Returns:
-    - transformed_poses: list of transformed poses in the format (px, py, pz, qw, qx, qy, qz)
+    - transformed_poses: NxM numpy array of transformed poses in the format (px, py, pz, qw, qx, qy, qz, ...)
     """
-    transformed_poses = []
-    i = 0
-    for pose in poses:
-        i += 1
-
-        # Convert pose to homogeneous transformation matrix
-        homo_pose = q_to_homogeneous(pose[3:7])
-        if (inverse_calibration):
-            homo_pose = np.linalg.inv(homo_pose)
-        homo_pose[:3, 3] = pose[:3]
+    if backend == 'numpy':
+        xp = np
+    elif backend == 'cupy':
+        import cupy as xp
+    else:
+        raise ValueError(f"Unknown backend '{backend}', expected 'numpy' or 'cupy'")
+
+    poses = np.asarray(poses, dtype=dtype)
+    if poses.size == 0:
+        return np.array([])
+    if debug:
+        _print_transform_diagnostics(poses[0], extrinsic_calibration, inverse_calibration)
+    poses = xp.asarray(poses)
+    extrinsic_calibration = xp.ascontiguousarray(xp.asarray(extrinsic_calibration, dtype=dtype))
+
+    # Repack the pose fields into contiguous arrays once, so every step below streams contiguous memory
+    positions = xp.ascontiguousarray(poses[:, :3])
+    quaternions = xp.ascontiguousarray(poses[:, 3:7])
+    extra = poses[:, 7:]
+    if poses.dtype != np.float64:
+        # Absorb the rounding of the reduced precision input
+        quaternions = quaternions / xp.linalg.norm(quaternions, axis=1, keepdims=True)
+
+    fused_transform = None
+    if pre_R is None and xp is np and len(poses) >= _FUSED_TRANSFORM_MIN_POSES and np.isfinite(extrinsic_calibration).all():
+        # Non-finite entries cannot be inlined as literals, such calibrations take the batched numpy path
+        fused_transform = _fused_transform_kernel(np.asarray(extrinsic_calibration, dtype=np.float64).tobytes())
+    if fused_transform is not None:
+        # Build the pose matrices and apply the extrinsic calibration in one pass (large batch, numba installed)
+        transformed_homo_poses = np.empty((len(poses), 4, 4), dtype=poses.dtype)
+        fused_transform(positions, quaternions, inverse_calibration, transformed_homo_poses)
+    else:
+        # Homogeneous matrices of all poses, with plain numpy so small batches do not wait for a numba compilation
+        homo_poses = xp.zeros((len(poses), 4, 4), dtype=poses.dtype)
+        homo_poses[:, :3, :3] = _q_to_rotation_batch(quaternions, xp=xp) if pre_R is None else xp.asarray(pre_R)
+        homo_poses[:, 3, 3] = 1
+        if inverse_calibration:
+            homo_poses = _inv_se3(homo_poses, xp=xp)
+        homo_poses[:, :3, 3] = positions
 
         # Apply extrinsic calibration
-        transformed_homo_pose = np.dot(homo_pose, extrinsic_calibration)
-
-        # Extract transformed pose
-        transformed_pose = np.zeros(len(pose))
-        transformed_pose[:3] = transformed_homo_pose[:3, 3]
-        if (not inverse_calibration):
-            transformed_homo_pose = np.linalg.inv(transformed_homo_pose)
-        transformed_quaternion = homogeneous_to_q(transformed_homo_pose[:3, :3])
-        transformed_pose[3:7] = transformed_quaternion
-
-        if debug:
-            print("pose\n", pose)
-            print("homo pose\n", homo_pose)
-            print("transformed homo pose\n", transformed_homo_pose)
-            print("transformed_quaternion\n", transformed_quaternion)
-            # # Do the inverse calculation just to test
-            # # print(transformed_pose[3:7])
-            back_to_initial_pose = q_to_homogeneous(transformed_quaternion)
-            back_to_initial_pose = np.linalg.inv(back_to_initial_pose)
-            print("back to initial pose\n", back_to_initial_pose)
-            back_to_initial_pose[:3, 3] = transformed_pose[:3]
-            extrinsic_calibration_inv = np.linalg.inv(
-                extrinsic_calibration)  # Inverse of the extrinsic calibration matrix
-
-            # transformed_back_to_initial_homo = np.dot(transformed_back_to_initial_homo, extrinsic_calibration_inv)
-            transformed_back_to_initial_homo = np.dot(back_to_initial_pose, extrinsic_calibration_inv)
-            transformed_quaternion = homogeneous_to_q(transformed_back_to_initial_homo[:3, :3])
-            new_formatted_transformed_pose = np.zeros(len(pose))
-            new_formatted_transformed_pose[:3] = transformed_back_to_initial_homo[:3, 3]
-            new_formatted_transformed_pose[3:7] = transformed_quaternion
-            # print(f"formatted transformed pose {i}\n", transformed_pose)
-            print("transformed_quaternion\n", transformed_quaternion)
-            # print("new pose\n", back_to_initial_pose)
-            print("transformed back to init homo\n", transformed_back_to_initial_homo)
-            print(f"new transformed pose {i}\n", new_formatted_transformed_pose)
-            if i > 0:
-                debug = False
-                # break #This is for debugging purposes to get just the first element of the poses. Comment out for full run
-                print("IMU coordinate system:", check_coordinate_system(homo_pose))
-                print("Extrinsic calibration coordinate system:", check_coordinate_system(extrinsic_calibration))
-                print("Transformed pose coordinate system:", check_coordinate_system(transformed_homo_pose))
-                break
-            if check_coordinate_system(homo_pose) != check_coordinate_system(extrinsic_calibration):
-                print(f"Error: Coordinate systems do not match at line {i}")
-                print("IMU coordinate system:", check_coordinate_system(homo_pose))
-                print("Extrinsic calibration coordinate system:", check_coordinate_system(extrinsic_calibration))
-                break
-
-        transformed_pose[7:] = pose[7:]
-        transformed_poses.append(transformed_pose)
-
-    return np.array(transformed_poses)
+        transformed_homo_poses = homo_poses @ extrinsic_calibration
+
+    # Extract transformed poses
+    transformed_positions = transformed_homo_poses[:, :3, 3]
+    if not inverse_calibration:
+        transformed_homo_poses = _inv_se3(transformed_homo_poses, xp=xp)
+    transformed_quaternions = homogeneous_to_q_batch(transformed_homo_poses[:, :3, :3], xp=xp)
+
+    # Back to one row per pose
+    transformed_poses = xp.concatenate([transformed_positions, transformed_quaternions, extra], axis=1)
+    if xp is not np:
+        transformed_poses = xp.asnumpy(transformed_poses)
+    return transformed_poses
+
+
+def _print_transform_diagnostics(pose, extrinsic_calibration, inverse_calibration=False):
+    """
+    Prints the intermediate matrices of transform_poses for a single pose, transforms the result back with the inverse
+    extrinsic calibration to check the round trip, and compares the coordinate systems of the matrices involved
+    """
+    # Invariants of the diagnostics, computed once
+    extrinsic_calibration_inv = _inv_se3(extrinsic_calibration)  # Inverse of the extrinsic calibration matrix
+    extrinsic_system = check_coordinate_system(extrinsic_calibration)
+
+    # Convert pose to homogeneous transformation matrix
+    homo_pose = q_to_homogeneous(pose[3:7])
+    if (inverse_calibration):
+        homo_pose = _inv_se3(homo_pose)
+    homo_pose[:3, 3] = pose[:3]
+
+    # Apply extrinsic calibration
+    transformed_homo_pose = np.dot(homo_pose, extrinsic_calibration)
+
+    # Extract transformed pose
+    transformed_pose = np.zeros(len(pose))
+    transformed_pose[:3] = transformed_homo_pose[:3, 3]
+    if (not inverse_calibration):
+        transformed_homo_pose = _inv_se3(transformed_homo_pose)
+    transformed_quaternion = homogeneous_to_q(transformed_homo_pose[:3, :3])
+    transformed_pose[3:7] = transformed_quaternion
+
+    print("pose\n", pose)
+    print("homo pose\n", homo_pose)
+    print("transformed homo pose\n", transformed_homo_pose)
+    print("transformed_quaternion\n", transformed_quaternion)
+
+    # Do the inverse calculation just to test
+    back_to_initial_pose = q_to_homogeneous(transformed_quaternion)
+    back_to_initial_pose = _inv_se3(back_to_initial_pose)
+    print("back to initial pose\n", back_to_initial_pose)
+    back_to_initial_pose[:3, 3] = transformed_pose[:3]
+    transformed_back_to_initial_homo = np.dot(back_to_initial_pose, extrinsic_calibration_inv)
+    transformed_quaternion = homogeneous_to_q(transformed_back_to_initial_homo[:3, :3])
+    new_formatted_transformed_pose = np.zeros(len(pose))
+    new_formatted_transformed_pose[:3] = transformed_back_to_initial_homo[:3, 3]
+    new_formatted_transformed_pose[3:7] = transformed_quaternion
+    print("transformed_quaternion\n", transformed_quaternion)
+    print("transformed back to init homo\n", transformed_back_to_initial_homo)
+    print("new transformed pose\n", new_formatted_transformed_pose)
+
+    pose_system = check_coordinate_system(homo_pose)
+    print("IMU coordinate system:", pose_system)
+    print("Extrinsic calibration coordinate system:", extrinsic_system)
+    print("Transformed pose coordinate system:", check_coordinate_system(transformed_homo_pose))
+    if pose_system != extrinsic_system:
+        print("Error: Coordinate systems do not match")
 
 
 def quat_multiply(q1, q2):
     """
-    Multiplying two quaternions in the format (qx, qy, qz, qw).
+    Multiplying two quaternions in the format (qw, qx, qy, qz) with the Hamilton product.
     Essentially using the formula q1*q2 = (scalar1*scalar2 - dot(vector1, vector2), scalar1*vector2 + scalar2*vector1 + cross(vector1, vector2)
 
     Parameters: q1, q2 quaternions
 
     Returns: q1*q2
     """
-    scalar1 = q1[3]
-    scalar2 = q2[3]
-    vector1 = q1[:3]
-    vector2 = q2[:3]
-    scal = scalar1 * scalar2 - np.dot(vector1, vector2)
-
-    v1 = Vector3([vector1])
-    v2 = Vector3([vector2])
-    vect = np.dot(scalar1, v1) + np.dot(scalar2, v2) + np.cross(vector1, vector2)
-    arr = np.zeros(4)
-    arr[0] = scal
-    arr[1:4] = vect
-    print("arr:", arr)
-    return arr
+    q1 = np.asarray(q1, dtype=np.float64)
+    q2 = np.asarray(q2, dtype=np.float64)
+    out = np.empty(4)
+    kernels = _scalar_kernels()
+    if kernels is not None:
+        kernels[1](q1, q2, out)
+    else:
+        _quat_multiply(q1, q2, out)
+    return out
+
+
+def _quat_multiply(q1, q2, out):
+    """
+    Writes the Hamilton product q1*q2 of two quaternions in the format (qw, qx, qy, qz) into out.
+    Plain scalar code so that it runs as is without numba and compiles with numba when it is installed.
+    """
+    w1, x1, y1, z1 = q1[0], q1[1], q1[2], q1[3]
+    w2, x2, y2, z2 = q2[0], q2[1], q2[2], q2[3]
+    out[0] = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+    out[1] = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+    out[2] = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+    out[3] = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+
+
+@lru_cache(maxsize=None)
+def _scalar_kernels():
+    """
+    Compiles (on first use) the numba kernels of the single quaternion functions _homogeneous_to_q and _quat_multiply.
+
+    Returns: The kernels (homogeneous_to_q(m, out), quat_multiply(q1, q2, out)), or None if numba is not installed.
+    """
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    return numba.njit(cache=True, fastmath=True)(_homogeneous_to_q), numba.njit(cache=True, fastmath=True)(_quat_multiply)
+
+
+def quat_multiply_batch(Q1, Q2):
+    """
+    Multiplying N pairs of quaternions in the format (qw, qx, qy, qz) with the Hamilton product, one vectorized expression per component.
+
+    Parameters: Q1, Q2 Nx4 arrays of quaternions (a single 4-element quaternion is broadcast against the other batch)
+
+    Returns: Nx4 array of Q1*Q2
+    """
+    w1, x1, y1, z1 = np.moveaxis(np.asarray(Q1), -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(np.asarray(Q2), -1, 0)
+    return np.stack([w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                     w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                     w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2], axis=-1)
+
+
+# Coefficients of Eberly's polynomial approximation of slerp ("A Fast and Accurate Algorithm for Computing SLERP"),
+# u[i] = 1 / (i * (2i + 1)) and v[i] = i / (2i + 1) for i = 1..8, with the last pair scaled to minimize the maximum error
+_SLERP_MU = 1.85298109240830
+_SLERP_U = np.array([1 / (i * (2 * i + 1)) for i in range(1, 9)])
+_SLERP_V = np.array([i / (2 * i + 1) for i in range(1, 9)])
+_SLERP_U[7] *= _SLERP_MU
+_SLERP_V[7] *= _SLERP_MU
+
+
+def _slerp_coefficient(x, t):
+    """
+    Eberly's polynomial for sin(t * theta) / sin(theta), where x = cos(theta) >= 0, without any trigonometric call
+    """
+    xm1 = x - 1
+    t2 = t * t
+    coefficient = 1
+    for i in range(7, -1, -1):
+        coefficient = 1 + (_SLERP_U[i] * t2 - _SLERP_V[i]) * xm1 * coefficient
+    return t * coefficient
+
+
+def slerp_batch(Q0, Q1, T):
+    """
+    Spherical linear interpolation between N pairs of unit quaternions in the format (qw, qx, qy, qz), using Eberly's
+    polynomial approximation instead of acos/sin (maximum error around 2e-5). The shorter path is always taken.
+
+    Args:
+    - Q0: Nx4 numpy array of quaternions at T = 0
+    - Q1: Nx4 numpy array of quaternions at T = 1
+    - T: N numpy array (or a float) of interpolation parameters in [0, 1]
+
+    Returns:
+    - Nx4 numpy array of the interpolated quaternions
+    """
+    Q0 = np.asarray(Q0, dtype=np.float64)
+    Q1 = np.asarray(Q1, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)[..., None]
+
+    # Flip Q1 where the quaternions are more than 90 degrees apart, so that the interpolation takes the shorter path
+    x = np.sum(Q0 * Q1, axis=-1, keepdims=True)
+    sign = np.where(x < 0, -1.0, 1.0)
+    x = x * sign
+
+    return _slerp_coefficient(x, 1 - T) * Q0 + _slerp_coefficient(x, T) * sign * Q1
+
+
+def slerp(q0, q1, t):
+    """
+    Spherical linear interpolation between two unit quaternions in the format (qw, qx, qy, qz), see slerp_batch
+
+    Args:
+    - q0: 4x1 numpy array quaternion at t = 0
+    - q1: 4x1 numpy array quaternion at t = 1
+    - t: float, interpolation parameter in [0, 1]
+
+    Returns:
+    - 4x1 numpy array of the interpolated quaternion
+    """
+    return slerp_batch(q0, q1, t)
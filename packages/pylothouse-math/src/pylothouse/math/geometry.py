@@ -1,9 +1,15 @@
 from __future__ import annotations
 from functools import singledispatch
 import math
+import operator
+import weakref
+import numpy as np
 import _internal._helpers as _helpers
 
 class GeometryObserver:
+    # __weakref__ keeps slotted subclasses registrable in GeometryConfig._observers
+    __slots__ = ('__weakref__',)
+
     def update_origin(self):
         pass
 
@@ -11,7 +17,8 @@ class GeometryObserver:
 class GeometryConfig:
     _origin = 'topleft'
     _precision = 10
-    _observers = []
+    # Weak references, so registered objects are dropped once they are garbage collected
+    _observers = weakref.WeakSet()
     _verbose = False
 
     @classmethod
@@ -52,17 +59,15 @@ class GeometryConfig:
 
     @classmethod
     def register_observer(cls, observer: GeometryObserver):
-        if observer not in cls._observers:
-            cls._observers.append(observer)
+        cls._observers.add(observer)
 
     @classmethod
     def unregister_observer(cls, observer: GeometryObserver):
-        if observer in cls._observers:
-            cls._observers.remove(observer)
+        cls._observers.discard(observer)
 
     @classmethod
     def notify_observers(cls, ):
-        for observer in cls._observers:
+        for observer in list(cls._observers):
             observer.update_origin()
 
 
@@ -129,6 +134,43 @@ class GeometryUtils:
         return True
 
 
+def _as_xy_array(vertices):
+    """
+
+    :param vertices: Sequence of Vertex2D objects or (N, 2) array of coordinates
+    :return: (N, 2) float64 array of the x, y coordinates
+    """
+    if isinstance(vertices, np.ndarray):
+        return vertices.astype(np.float64, copy=False).reshape(-1, 2)
+    return np.array([(vertex.x, vertex.y) for vertex in vertices], dtype=np.float64).reshape(-1, 2)
+
+
+def _orient(ax, ay, bx, by, cx, cy):
+    """
+
+    :return: Cross product (b - a) x (c - a). The sign gives the side of line ab that c lies on, 0 if a, b, c are collinear
+    """
+    return (bx - ax) * (cy - ay) - (cx - ax) * (by - ay)
+
+
+def _are_collinear(a, b, c):
+    """
+
+    :param a, b, c: Vertex2D objects
+    :return: True if the vertices are collinear, within the relative tolerance math.isclose uses by default
+    """
+    p = (b.x - a.x) * (c.y - a.y)
+    q = (c.x - a.x) * (b.y - a.y)
+    return abs(p - q) <= 1e-9 * max(abs(p), abs(q))
+
+
+# C-implemented sort keys. Descending components are handled by stable two-pass sorts with reverse=True
+_key_x = operator.attrgetter('x')
+_key_y = operator.attrgetter('y')
+_key_xy = operator.attrgetter('x', 'y')
+_key_yx = operator.attrgetter('y', 'x')
+
+
 class Vertex2D(GeometryObserver):
     """
     Coordinate system is as follows:
@@ -137,24 +179,20 @@ class Vertex2D(GeometryObserver):
     - Origin is at (0, 0) and can be set to 'topleft' or 'bottomleft' (Default is 'topleft')
 
     """
+    __slots__ = ('x', 'y')
 
     def __init__(self, x, y):
         if not all(isinstance(i, float) or isinstance(i, int) for i in [x, y]):
             raise TypeError("Coordinates must be integers or floats")
         self.x = float(x)
         self.y = float(y)
-        GeometryConfig.register_observer(self)
-        self._origin = GeometryConfig.get_origin()
 
     def __str__(self):
         return f"({self.x}, {self.y})"
 
     @property
     def origin(self):
-        return self._origin
-
-    def update_origin(self):
-        self._origin = GeometryConfig.get_origin()
+        return GeometryConfig.get_origin()
 
     def equals(self, vertex):
         vertex = GeometryUtils.Vertex2D(vertex, self.equals)
@@ -162,13 +200,31 @@ class Vertex2D(GeometryObserver):
 
 
     def distance_to_vertex(self, vertex):
-        return ((vertex.x - self.x) ** 2 + (vertex.y - self.y) ** 2) ** 0.5
+        return math.hypot(vertex.x - self.x, vertex.y - self.y)
+
+    def _squared_distances(self, vertices):
+        xy = _as_xy_array(vertices)
+        dx = xy[:, 0] - self.x
+        dy = xy[:, 1] - self.y
+        return dx * dx + dy * dy
 
     def closest_vertex(self, vertices):
-        return min(vertices, key=lambda vertex: self.distance_to_vertex(vertex))
+        """
+        :param vertices: Sequence of Vertex2D objects or (N, 2) array of coordinates
+        :return: The closest vertex (the matching row for an array)
+        """
+        if not isinstance(vertices, np.ndarray):
+            vertices = list(vertices)
+        return vertices[int(np.argmin(self._squared_distances(vertices)))]
 
     def farthest_vertex(self, vertices):
-        return max(vertices, key=lambda vertex: self.distance_to_vertex(vertex))
+        """
+        :param vertices: Sequence of Vertex2D objects or (N, 2) array of coordinates
+        :return: The farthest vertex (the matching row for an array)
+        """
+        if not isinstance(vertices, np.ndarray):
+            vertices = list(vertices)
+        return vertices[int(np.argmax(self._squared_distances(vertices)))]
 
     def is_above_line(self, line) -> bool:
         """
@@ -179,7 +235,7 @@ class Vertex2D(GeometryObserver):
         if line.is_vertical:
             raise ValueError(f"{self.is_above_line.__name__} Line is vertical")
         y_at = line.y_at(self.x)
-        if self._origin == 'bottomleft':
+        if GeometryConfig.get_origin() == 'bottomleft':
             return self.y > y_at
         else:
             return self.y < y_at
@@ -210,10 +266,10 @@ class Vertex2D(GeometryObserver):
         :param line: Line2D object
         :return: True if the vertex is on the line, False otherwise
         """
-        if line.is_horizontal:
-            return math.isclose(self.y, line.y_at(self.x))
-        elif line.is_vertical:
-            return math.isclose(self.x, line.x_at(self.y))
+        if line._is_horizontal:
+            return math.isclose(self.y, line.A.y)
+        elif line._is_vertical:
+            return math.isclose(self.x, line.A.x)
         else:
             return math.isclose(self.y, line.y_at(self.x)) and math.isclose(self.x, line.x_at(self.y))
 
@@ -241,13 +297,24 @@ class Vertex2D(GeometryObserver):
 
 
 class Line2D(GeometryObserver):
+    __slots__ = ('A', 'B', '_slope', '_x_intercept', '_y_intercept', '_is_vertical', '_is_horizontal')
 
     def __init__(self, vertices):
         vertexA, vertexB = GeometryUtils.list_of_Vertex2D(vertices, self.__init__)
         self.A = vertexA
         self.B = vertexB
-        GeometryConfig.register_observer(self)
-        self._origin = GeometryConfig.get_origin()
+
+        # The line is not modified after construction, so its slope and intercepts are computed once
+        dx = vertexB.x - vertexA.x
+        self._is_vertical = dx == 0
+        self._slope = None if self._is_vertical else (vertexB.y - vertexA.y) / dx
+        self._is_horizontal = self._slope == 0
+        if self._slope:
+            self._y_intercept = vertexA.y - self._slope * vertexA.x
+            self._x_intercept = -self._y_intercept / self._slope
+        else:
+            self._y_intercept = vertexA.y
+            self._x_intercept = vertexA.x
 
     @classmethod
     def from_segment(cls, segment: Segment2D):
@@ -260,78 +327,67 @@ class Line2D(GeometryObserver):
 
     @property
     def origin(self):
-        return self._origin
-
-    def update_origin(self):
-        self._origin = GeometryConfig.get_origin()
+        return GeometryConfig.get_origin()
 
     @property
     def slope(self):
-        if self.A and self.B and self.A.x != self.B.x:
-            return (self.B.y - self.A.y) / (self.B.x - self.A.x)
-        else:
-            return None
+        return self._slope
 
     @property
     def x_intercept(self):
-        if self.slope:
-            return -self.y_intercept / self.slope
-        else:
-            return self.A.x
+        return self._x_intercept
 
     @property
     def y_intercept(self):
-        if self.slope:
-            return self.A.y - self.slope * self.A.x
-        else:
-            return self.A.y
+        return self._y_intercept
 
     @property
     def is_horizontal(self):
-        return self.slope == 0
+        return self._is_horizontal
 
     @property
     def is_vertical(self):
-        return self.slope == None
+        return self._is_vertical
 
     def is_parallel_to(self, line: Line2D):
-        if self.slope is None and line.slope is None:
+        if self._slope is None and line._slope is None:
             return True
-        elif self.slope is None or line.slope is None:
+        elif self._slope is None or line._slope is None:
             return False
         else:
-            return math.isclose(self.slope, line.slope)
+            return math.isclose(self._slope, line._slope)
 
 
     def is_perpendicular_to(self, line: Line2D):
-        if self.slope is None and line.slope is None:
+        if self._slope is None and line._slope is None:
             return False
-        elif line.slope is None:
-            return math.isclose(self.slope, 0)
-        elif self.slope is None:
-            return math.isclose(line.slope, 0)
+        # math.isclose(slope, 0) only holds for an exact 0, i.e. a horizontal line
+        elif line._slope is None:
+            return self._is_horizontal
+        elif self._slope is None:
+            return line._is_horizontal
         else:
-            return math.isclose(self.slope * line.slope, -1)
+            return math.isclose(self._slope * line._slope, -1)
 
     def collinear(self, line: Line2D):
         GeometryUtils.check_Line2D(line, self.collinear)
         return self.is_parallel_to(line) and self.A.is_on_line(line)
 
     def x_at(self, y):
-        if self.is_horizontal:
+        if self._is_horizontal:
             raise ValueError(f"{self.x_at.__name__} Line is horizontal")
-        elif self.is_vertical:
+        elif self._is_vertical:
             return self.A.x
         else:
-            return (y - self.y_intercept) / self.slope
+            return (y - self._y_intercept) / self._slope
 
     def y_at(self, x):
-        if self.is_vertical:
+        if self._is_vertical:
             raise ValueError(f"{self.y_at.__name__} Line is vertical")
-        elif self.is_horizontal:
+        elif self._is_horizontal:
             return self.A.y
         else:
-            return self.slope * x + self.y_intercept
+            return self._slope * x + self._y_intercept
 
     def angle_with_line(self, line: Line2D): # TODO: Fix angles
         pass
@@ -351,17 +407,17 @@ class Line2D(GeometryObserver):
         GeometryUtils.check_Line2D(line, self.intersection)
         if self.is_parallel_to(line):
             return None
-        if self.is_vertical:
+        if self._is_vertical:
             x = self.A.x
             y = line.y_at(x)
-        elif line.is_vertical:
+        elif line._is_vertical:
             x = line.A.x
             y = self.y_at(x)
         else:
-            slope1 = self.slope
-            slope2 = line.slope
-            y_intercept1 = self.y_intercept
-            y_intercept2 = line.y_intercept
+            slope1 = self._slope
+            slope2 = line._slope
+            y_intercept1 = self._y_intercept
+            y_intercept2 = line._y_intercept
             x = (y_intercept2 - y_intercept1) / (slope1 - slope2)
             y = slope1 * x + y_intercept1
         return Vertex2D(x, y)
@@ -388,6 +444,7 @@ class Line2D(GeometryObserver):
 
 
 class Segment2D(Line2D):
+    __slots__ = ()
 
     def __str__(self):
         return f"Segment2D({self.A}, {self.B})"
@@ -400,7 +457,7 @@ class Segment2D(Line2D):
     @property
     def length(self):
         if self.A and self.B:
-            return ((self.B.x - self.A.x) ** 2 + (self.B.y - self.A.y) ** 2) ** 0.5
+            return math.hypot(self.B.x - self.A.x, self.B.y - self.A.y)
         else:
             return None
 
@@ -509,6 +566,7 @@ class Segment2D(Line2D):
 
 
 class Quadrilateral(GeometryObserver):
+    __slots__ = ('_A', '_B', '_C', '_D', '_AB', '_BC', '_CD', '_DA', '_type')
 
     def __init__(self, vertices: list[Vertex2D], check_quad_validity=True):
         """
@@ -519,9 +577,6 @@ class Quadrilateral(GeometryObserver):
         """
         # _vertices = GeometryUtils.list_of_Vertex2D(vertices, self.__init__)
 
-        GeometryConfig.register_observer(self)
-        self._origin = GeometryConfig.get_origin()
-
         self._A = vertices[0]
         self._B = vertices[1]
         self._C = vertices[2]
@@ -537,19 +592,25 @@ class Quadrilateral(GeometryObserver):
         vertices = GeometryUtils.list_of_Vertex2D(vertices, cls.non_oriented_vertices)
         _origin = GeometryConfig.get_origin()
         if _origin == 'topleft':
-            left_to_right = sorted(vertices, key=lambda v: (v.x, v.y))
-            top_to_bottom = sorted(left_to_right[:2], key=lambda v: (v.y, -v.x))
+            # key (x, y)
+            left_to_right = sorted(vertices, key=_key_xy)
+            # key (y, -x)
+            top_to_bottom = sorted(sorted(left_to_right[:2], key=_key_x, reverse=True), key=_key_y)
         else:
-            left_to_right = sorted(vertices, key=lambda v: (v.x, -v.y))
-            top_to_bottom = sorted(left_to_right[:2], key=lambda v: (-v.y, -v.x))
+            # key (x, -y)
+            left_to_right = sorted(sorted(vertices, key=_key_y, reverse=True), key=_key_x)
+            # key (-y, -x)
+            top_to_bottom = sorted(left_to_right[:2], key=_key_yx, reverse=True)
 
         _A = top_to_bottom[0]
         _D = top_to_bottom[1]
 
         if _origin == 'topleft':
-            top_to_bottom = sorted(left_to_right[2:], key=lambda v: (v.y, v.x))
+            # key (y, x)
+            top_to_bottom = sorted(left_to_right[2:], key=_key_yx)
         else:
-            top_to_bottom = sorted(left_to_right[2:], key=lambda v: (-v.y, v.x))
+            # key (-y, x)
+            top_to_bottom = sorted(sorted(left_to_right[2:], key=_key_x), key=_key_y, reverse=True)
 
         _B = top_to_bottom[0]
         _C = top_to_bottom[1]
@@ -568,34 +629,29 @@ class Quadrilateral(GeometryObserver):
     def __updatelines(self):
         if not self._A or not self._B or not self._C or not self._D:
             raise ValueError("Vertices are missing")
-        self._AB = Segment2D([self._A, self._B])
-        self._BC = Segment2D([self._B, self._C])
-        self._CD = Segment2D([self._C, self._D])
-        self._DA = Segment2D([self._D, self._A])
+        # The side segments are built on first access, see the AB/BC/CD/DA properties
+        self._AB = None
+        self._BC = None
+        self._CD = None
+        self._DA = None
 
     def __check_quad_validity(self):
-        for vertex in [self._A, self._B, self._C, self._D]:
-            triplet = [v for v in [self._A, self._B, self._C, self._D] if v != vertex]
-            if triplet[0].collinear(triplet[1:]):
+        A, B, C, D = self._A, self._B, self._C, self._D
+        for triplet in ([B, C, D], [A, C, D], [A, B, D], [A, B, C]):
+            if _are_collinear(*triplet):
                 raise ValueError(f"Collinear vertices: {triplet} cannot form a quadrilateral")
 
-        for seg in [self.AB, self.BC, self.CD, self.DA]:
-            intersects = 0
-            for quad_seg in [self.AB, self.BC, self.CD, self.DA]:
-                if seg == quad_seg:
-                    continue
-                if seg.intersects(quad_seg):
-                    intersects += 1
-            if intersects > 2:
+        # With no three vertices collinear, adjacent sides always meet at their shared vertex, so the sides
+        # intersect more than twice exactly when the line of a side crosses its opposite side
+        for P, Q, R, S in ((A, B, C, D), (B, C, D, A)):
+            if (_orient(P.x, P.y, Q.x, Q.y, R.x, R.y) > 0) != (_orient(P.x, P.y, Q.x, Q.y, S.x, S.y) > 0) or \
+                    (_orient(R.x, R.y, S.x, S.y, P.x, P.y) > 0) != (_orient(R.x, R.y, S.x, S.y, Q.x, Q.y) > 0):
                 raise ValueError(
                     f"{self.__init__.__name__} The lines of the quadrilateral intersect more than twice. Cannot form a quadrilateral")
 
     @property
     def origin(self):
-        return self._origin
-
-    def update_origin(self):
-        self._origin = GeometryConfig.get_origin()
+        return GeometryConfig.get_origin()
 
     @classmethod
     def rectangle(cls, x, y, width, height, check_validity=True):
@@ -711,18 +767,26 @@ class Quadrilateral(GeometryObserver):
 
     @property
     def AB(self) -> Segment2D:
+        if self._AB is None:
+            self._AB = Segment2D([self._A, self._B])
         return self._AB
 
     @property
     def BC(self) -> Segment2D:
+        if self._BC is None:
+            self._BC = Segment2D([self._B, self._C])
         return self._BC
 
     @property
     def CD(self) -> Segment2D:
+        if self._CD is None:
+            self._CD = Segment2D([self._C, self._D])
         return self._CD
 
     @property
     def DA(self) -> Segment2D:
+        if self._DA is None:
+            self._DA = Segment2D([self._D, self._A])
         return self._DA
 
     @property
@@ -760,7 +824,9 @@ class Quadrilateral(GeometryObserver):
 
     @property
     def perimeter(self):
-        return self.AB.length + self.BC.length + self.CD.length + self.DA.length
+        A, B, C, D = self._A, self._B, self._C, self._D
+        return (math.hypot(B.x - A.x, B.y - A.y) + math.hypot(C.x - B.x, C.y - B.y) +
+                math.hypot(D.x - C.x, D.y - C.y) + math.hypot(A.x - D.x, A.y - D.y))
 
     @property
     def area(self):
@@ -829,6 +895,36 @@ class Quadrilateral(GeometryObserver):
             return not vertex.is_above_line(self.AB) and not vertex.is_below_line(self.CD) and not vertex.is_right_of_line(self.BC) and not vertex.is_left_of_line(self.DA) and not self.has_on_perimeter(vertex)
 
 
+    def encloses_points(self, points, include_sides=True):
+        """
+        Vectorized containment test for many points. The quadrilateral is taken as convex (as the validity check
+        enforces), so a point is enclosed when it lies on the same side of all four sides.
+
+        :param points: (N, 2) array of coordinates or sequence of Vertex2D objects
+        :param include_sides: Whether points on the sides count as enclosed
+        :return: (N,) boolean array, True for the enclosed points
+        """
+        xy = _as_xy_array(points)
+        x = xy[:, 0]
+        y = xy[:, 1]
+        if self._type == "rectangle":
+            if include_sides:
+                return (self._A.x <= x) & (x <= self._B.x) & (self._A.y <= y) & (y <= self._D.y)
+            return (self._A.x < x) & (x < self._B.x) & (self._A.y < y) & (y < self._D.y)
+
+        clockwise = np.ones(len(xy), dtype=bool)
+        counterclockwise = clockwise.copy()
+        for P, Q in ((self._A, self._B), (self._B, self._C), (self._C, self._D), (self._D, self._A)):
+            cross = (Q.x - P.x) * (y - P.y) - (Q.y - P.y) * (x - P.x)
+            if include_sides:
+                clockwise &= cross <= 0
+                counterclockwise &= cross >= 0
+            else:
+                clockwise &= cross < 0
+                counterclockwise &= cross > 0
+        return clockwise | counterclockwise
+
+
     def encloses_segment(self, segment: Segment2D, includes_sides=True) -> bool:
         """
 
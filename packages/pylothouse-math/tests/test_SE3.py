@@ -0,0 +1,10 @@
+import numpy as np
+
+
+def test_q_to_homogeneous_sign_invariant():
+    from pylothouse.math import SE3
+
+    rng = np.random.default_rng(0)
+    for q in rng.normal(size=(100, 4)):
+        q /= np.linalg.norm(q)
+        assert np.array_equal(SE3.q_to_homogeneous(q), SE3.q_to_homogeneous(-q))
@@ -0,0 +1,35 @@
+import sys
+import threading
+
+from _internal import _helpers
+
+
+def test_print_prefix_decorator_restores_stdout_across_threads(capsys):
+    short_started = threading.Event()
+    long_started = threading.Event()
+    short_done = threading.Event()
+
+    @_helpers.func_name_print_prefix_decorator
+    def short():
+        short_started.set()
+        long_started.wait(5)
+        print("from short")
+
+    @_helpers.func_name_print_prefix_decorator
+    def long():
+        long_started.set()
+        short_done.wait(5)
+        print("from long")
+
+    stdout = sys.stdout
+    threads = [threading.Thread(target=short), threading.Thread(target=long)]
+    threads[0].start()
+    short_started.wait(5)
+    threads[1].start()
+    threads[0].join(5)
+    short_done.set()
+    threads[1].join(5)
+
+    assert sys.stdout is stdout
+    print("after")
+    assert capsys.readouterr().out.splitlines() == ["short: from short", "long: from long", "after"]